@@ -0,0 +1,26 @@
+"""파일을 원자적으로 쓰기
+
+임시 파일에 다 쓴 뒤 os.replace로 교체하므로, 쓰는 도중에 읽거나 죽어도 깨진 파일이 보이지 않는다.
+(음식점 목록, 크롤링/설명 캐시, 이미지 색인, 다운로드 기록, 메트릭 파일이 같이 씀)
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+def write_text_atomic(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 여러 스레드가 같은 파일을 써도 임시 파일이 겹치지 않도록 스레드마다 다른 이름
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+        raise
+
+def write_json_atomic(path, data):
+    write_text_atomic(path, json.dumps(data, ensure_ascii=False, indent=2))
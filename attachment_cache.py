@@ -0,0 +1,44 @@
+"""디스코드에 올린 메뉴 이미지의 첨부파일 URL 캐시
+
+같은 이미지를 명령어마다 다시 업로드하지 않도록, 한 번 올린 이미지의 CDN URL을
+하루 동안 기억한다. 파일이 다시 받아지면(mtime/크기 변경) 캐시에서 빠진다.
+"""
+import os
+
+class AttachmentCache:
+    def __init__(self):
+        self.day = None
+        self._urls = {}
+
+    def _key(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def _check_day(self, today):
+        if self.day != today:
+            self.day = today
+            self._urls = {}
+
+    def get(self, path, today):
+        self._check_day(today)
+        key = self._key(path)
+        return self._urls.get(key) if key else None
+
+    def put(self, path, url, today):
+        self._check_day(today)
+        key = self._key(path)
+        if key:
+            self._urls[key] = url
+
+    def get_all(self, paths, today):
+        """모든 경로가 캐시에 있으면 {경로: URL}, 하나라도 없으면 None"""
+        urls = {}
+        for path in paths:
+            url = self.get(path, today)
+            if not url:
+                return None
+            urls[path] = url
+        return urls
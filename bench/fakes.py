@@ -0,0 +1,105 @@
+"""벤치마크용 가짜 디스코드 객체와 OpenAI 클라이언트 (네트워크 없이)
+
+봇 코드가 실제로 쓰는 속성/메서드만 흉내 낸다.
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+_ids = itertools.count(10 ** 17)
+
+class FakeUser:
+    def __init__(self, user_id=None, name='bench_user', bot=False):
+        self.id = user_id or next(_ids)
+        self.name = name
+        self.bot = bot
+
+    def __str__(self):
+        return self.name
+
+class FakeAttachment:
+    def __init__(self, filename):
+        self.filename = filename
+        self.url = f"https://cdn.discordapp.com/attachments/0/{next(_ids)}/{filename}"
+
+class FakeMessage:
+    def __init__(self, channel, content=None, embed=None, embeds=None, files=None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = embeds or ([embed] if embed else [])
+        self.attachments = [FakeAttachment(f.filename) for f in files or []]
+        self.reactions = []
+        self.edits = 0
+
+    async def edit(self, content=None, embed=None, **kwargs):
+        self.edits += 1
+        self.content = content
+        if embed is not None:
+            self.embeds = [embed]
+        await asyncio.sleep(0)
+
+    async def add_reaction(self, emoji):
+        self.reactions.append(emoji)
+        await asyncio.sleep(0)
+
+class FakeChannel:
+    def __init__(self, channel_id=None):
+        self.id = channel_id or next(_ids)
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        msg = FakeMessage(self, content, **kwargs)
+        self.sent.append(msg)
+        await asyncio.sleep(0)
+        return msg
+
+class FakeContext:
+    """commands.Context 대신 (author, channel, guild, send)"""
+    def __init__(self, author=None, channel=None, guild_id=1):
+        self.author = author or FakeUser()
+        self.channel = channel or FakeChannel()
+        self.guild = SimpleNamespace(id=guild_id) if guild_id else None
+        self.command = None
+        self.command_failed = False
+
+    async def send(self, content=None, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+class FakeReactionPayload:
+    """discord.RawReactionActionEvent 대신"""
+    def __init__(self, message_id, user_id, emoji='👍'):
+        self.message_id = message_id
+        self.user_id = user_id
+        self.emoji = emoji
+        self.member = None
+
+class _StubStream:
+    def __init__(self, text, chunk_size):
+        self._chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for piece in self._chunks:
+            await asyncio.sleep(0)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+class StubOpenAI:
+    """AsyncOpenAI 대신: chat.completions.create만 (고정 문장, 선택적 지연)"""
+    TEXT = "바삭한 겉과 촉촉한 속이 어우러진 한 끼! 점심시간을 행복하게 만들어 줄 거예요. 지금 바로 가보세요 😋"
+
+    def __init__(self, latency=0.0, chunk_size=8):
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model=None, messages=None, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if stream:
+            return _StubStream(self.TEXT, self.chunk_size)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.TEXT))])
@@ -0,0 +1,351 @@
+"""오프라인 벤치마크
+
+카카오 채널 페이지 구조를 흉내 낸 합성 페이지(bench/fixtures, 실제로 저장한 페이지 아님),
+가짜 디스코드 컨텍스트, 가짜 OpenAI 클라이언트로 크롤러 파싱과 명령어 처리 경로를 네트워크 없이 잰다.
+음식점 수는 30개부터 10k개까지 늘려 가며 잰다.
+
+    python bench/run.py                      # 전체 실행, 결과 JSON은 bench_results.json
+    python bench/run.py -k vote -k 리더보드   # 이름에 들어간 것만
+    python bench/run.py --quick              # 작은 크기만 (빠른 확인용)
+    python bench/run.py --compare old.json   # 이전 결과와 비교, threshold 넘게 느려지면 종료 코드 1
+
+봇 모듈은 임시 디렉터리에서 import해서 DB/로그/캐시 파일이 저장소를 건드리지 않는다.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+FIXTURES_DIR = BENCH_DIR / 'fixtures'
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fakes import FakeContext, FakeReactionPayload, FakeUser, StubOpenAI  # noqa: E402
+
+SIZES = [30, 1000, 10000]
+QUICK_SIZES = [30, 1000]
+CONCURRENT_REACTIONS = 1000
+
+# 측정
+
+class Bench:
+    def __init__(self, filters=(), min_time=0.2, max_runs=200):
+        self.filters = filters
+        self.min_time = min_time
+        self.max_runs = max_runs
+        self.results = []
+        self.loop = asyncio.new_event_loop()
+
+    def selected(self, name):
+        return not self.filters or any(f in name for f in self.filters)
+
+    def run(self, name, fn, size=None, runs=None, ops=1):
+        """fn()을 min_time 동안(최대 max_runs번) 반복해서 한 번당 시간 기록, 코루틴을 돌려주면 루프에서 실행"""
+        if not self.selected(name):
+            return
+        samples = []
+        started = time.perf_counter()
+        while len(samples) < (runs or self.max_runs):
+            t0 = time.perf_counter()
+            result = fn()
+            if inspect.isawaitable(result):
+                self.loop.run_until_complete(result)
+            samples.append(time.perf_counter() - t0)
+            if runs is None and time.perf_counter() - started >= self.min_time and len(samples) >= 3:
+                break
+        samples.sort()
+        result = {
+            'name': name,
+            'size': size,
+            'runs': len(samples),
+            'ops_per_run': ops,
+            'mean_ms': statistics.fmean(samples) * 1000,
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            'min_ms': samples[0] * 1000,
+            'ops_per_sec': ops / statistics.fmean(samples),
+        }
+        self.results.append(result)
+        print(f"{name:<40} size={str(size):>6}  p50 {result['p50_ms']:9.3f}ms  p95 {result['p95_ms']:9.3f}ms  "
+              f"({result['runs']} runs)", file=sys.stderr)
+
+# 데이터
+
+def load_fixtures():
+    manifest = json.loads((FIXTURES_DIR / 'manifest.json').read_text(encoding='utf-8'))
+    pages = [(c['key'], c['url'], (FIXTURES_DIR / c['file']).read_text(encoding='utf-8')) for c in manifest['channels']]
+    return datetime.fromisoformat(manifest['fixture_date']), pages
+
+def freeze_crawler_date(crawler, fixture_date):
+    """크롤러가 보는 '오늘'을 합성 페이지의 날짜로 고정"""
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(fixture_date.year, fixture_date.month, fixture_date.day, 12, 0)
+    crawler.datetime = FrozenDatetime
+
+def scaled_restaurants(n, seed=0):
+    """restaurants.json을 복제해서 n개로 (이름은 겹치지 않게, 평점/리뷰/추천 수는 흔들어서)"""
+    base = json.loads((REPO_DIR / 'restaurants.json').read_text(encoding='utf-8'))
+    rng = random.Random(seed)
+    restaurants = []
+    for i in range(n):
+        r = dict(base[i % len(base)])
+        if i >= len(base):
+            r['store_name'] = f"{r['store_name']} {i // len(base) + 1}호점"
+            r['rating'] = round(rng.uniform(3.5, 5.0), 2)
+            r['visited_review'] = rng.randrange(0, 3000)
+            r['blog_review'] = rng.randrange(0, 1000)
+        r['recommand'] = rng.randrange(0, 20)
+        restaurants.append(r)
+    return restaurants
+
+def import_bot(workdir):
+    """임시 디렉터리에서 봇 모듈 import (DB/로그/캐시 파일은 거기에 생김)"""
+    shutil.copy(REPO_DIR / 'restaurants.json', workdir / 'restaurants.json')
+    os.environ.setdefault('DISCORD_BOT_TOKEN', 'bench')
+    os.environ.setdefault('OPENAI_API_KEY', 'bench')
+    os.environ['LUNCH_DB_PATH'] = str(workdir / 'bench_base.db')
+    os.chdir(workdir)
+    import bot
+    logging.getLogger().setLevel(logging.WARNING)
+    bot.client = StubOpenAI()
+    return bot
+
+def install_dataset(bot, restaurants, workdir):
+    """봇 전역 저장소/인덱스를 n개짜리 데이터로 바꿔 끼움 (봇 시작할 때와 같은 순서로 연결)"""
+    from lunch_db import LunchDB
+    from restaurant_store import RestaurantStore
+    from leaderboard import Leaderboard
+    from restaurant_index import RestaurantIndex
+    from recommender import Recommender
+    from business_hours import BusinessHoursIndex
+    from description_cache import DescriptionCache
+    from log_pipeline import EventLogWriter
+
+    n = len(restaurants)
+    json_path = workdir / f'restaurants_{n}.json'
+    json_path.write_text(json.dumps(restaurants, ensure_ascii=False), encoding='utf-8')
+    db_path = workdir / f'bench_{n}.db'
+    for suffix in ('', '-wal', '-shm'):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    db = LunchDB(str(db_path))
+    db.import_legacy(json_path, workdir / 'missing.jsonl')
+
+    store = RestaurantStore(backend=db)
+    board = Leaderboard()
+    board.rebuild(store.all())
+    store.add_listener(board.update)
+    index = RestaurantIndex(store.all())
+    recommender = Recommender(store.all())
+    store.add_listener(recommender.update)
+
+    bot.db = db
+    bot.restaurant_store = store
+    bot.leaderboard = board
+    bot.restaurant_index = index
+    bot.recommender = recommender
+    bot.hours_index = BusinessHoursIndex(store.all())
+    bot.event_log = EventLogWriter(workdir / f'recommend_log_{n}.jsonl', on_batch=db.log_recommendations)
+    bot.description_cache = DescriptionCache(workdir / f'description_cache_{n}.json', version=bot.DESCRIPTION_PROMPT_VERSION)
+    return db
+
+def drain(loop, bot):
+    """DB를 닫기 전에 미뤄둔 저장(추천 수, 추천 이력, 설명 캐시)을 모두 끝냄"""
+    async def flush_all():
+        await bot.restaurant_store.flush()
+        await bot.event_log.flush()
+        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        await asyncio.gather(*pending, return_exceptions=True)
+    loop.run_until_complete(flush_all())
+
+# 벤치마크
+
+def bench_crawler(b, crawler, pages, scales):
+    from bs4 import BeautifulSoup
+    for key, url, html in pages:
+        b.run(f'crawler.parse_html_cards[{key}]', lambda html=html: crawler.parse_html_cards(html), size=len(html))
+
+    cards_by_key = {key: crawler.parse_html_cards(html) for key, _, html in pages}
+    for key, cards in cards_by_key.items():
+        for scale in scales:
+            many = cards * scale
+            b.run(f'crawler.parse_today_cards[{key}]', lambda many=many, key=key: crawler.parse_today_cards(many, key),
+                  size=len(many))
+        b.run(f'crawler.find_today_img_url[{key}]',
+              lambda cards=cards, key=key: crawler.find_today_img_url(cards, key, 'dinner' if key == '에이스하이엔드10차' else 'lunch'),
+              size=len(cards))
+
+    thumbs = [t for _, _, html in pages for t in BeautifulSoup(html, 'html.parser').select('div.wrap_fit_thumb')]
+    for scale in scales:
+        many = thumbs * scale
+        b.run('crawler.extract_img_url_from_thumb', lambda many=many: [crawler.extract_img_url_from_thumb(t) for t in many],
+              size=len(many), ops=len(many))
+
+def bench_menu(b, bot, workdir, scales):
+    images_dir = workdir / 'kakao_images'
+    images_dir.mkdir(exist_ok=True)
+    keys = ['대륭18차', '대륭17차', '에이스하이엔드10차']
+    for scale in scales:
+        images = []
+        for i in range(3 * scale):
+            path = images_dir / f"{keys[i % 3]}{i // 3 or ''}_2025_05_26.jpg"
+            path.write_bytes(b'\xff\xd8' + bytes(2048) + b'\xff\xd9')
+            images.append((keys[i % 3], str(path), i % 5 == 4))
+        images += images[:len(images) // 3]  # 중복도 섞어서
+
+        def grouping(images=images):
+            items = bot.menu_items(bot.group_menu_images(images), '점심')
+            return bot.build_menu_embeds(items, {p: f"https://cdn.example/{i}" for i, (_, p) in enumerate(items)})
+        b.run('menu.group_and_build_embeds', grouping, size=len(images))
+
+        today = bot.today_str()
+        for _, path, _ in set(images):
+            bot.attachment_cache.put(path, f"https://cdn.example/{os.path.basename(path)}", today)
+
+        async def send_cached(images=images):
+            await bot.send_menu_images(FakeContext(), images, '점심')
+        b.run('menu.send_menu_images[cached]', send_cached, size=len(images))
+
+        async def send_upload(images=images):
+            await bot.upload_menu_images(FakeContext(), bot.menu_items(bot.group_menu_images(images), '점심'), today)
+        b.run('menu.upload_menu_images', send_upload, size=len(images), runs=5)
+
+def bench_commands(b, bot, workdir, sizes):
+    for n in sizes:
+        restaurants = scaled_restaurants(n)
+        db = install_dataset(bot, restaurants, workdir)
+        names = [r['store_name'] for r in restaurants]
+
+        # 반응 집계: 추천 메시지 몇 개에 사용자 CONCURRENT_REACTIONS명이 동시에 👍, 그리고 동시에 취소
+        message_ids = list(range(1, 21))
+        for message_id in message_ids:
+            db.register_message(message_id, 1, names[message_id % n])
+        users = list(range(1, CONCURRENT_REACTIONS + 1))
+
+        async def react(users=users):
+            await asyncio.gather(*(
+                bot.on_raw_reaction_add(FakeReactionPayload(message_ids[u % len(message_ids)], u)) for u in users))
+
+        async def unreact(users=users):
+            await asyncio.gather(*(
+                bot.on_raw_reaction_remove(FakeReactionPayload(message_ids[u % len(message_ids)], u)) for u in users))
+
+        async def react_cycle():
+            await react()
+            await unreact()
+        b.run('vote.concurrent_add_remove', react_cycle, size=n, runs=3, ops=2 * CONCURRENT_REACTIONS)
+
+        # 주간 리더보드에 넣을 추천 기록
+        b.loop.run_until_complete(react())
+        categories = sorted({c.strip() for r in restaurants for c in r['category'].split(',') if c.strip()})
+        for option in (None, '주간', categories[0]):
+            label = option or '전체'
+            b.run(f'command.리더보드[{label}]', lambda option=option: bot.리더보드(FakeContext(), option=option), size=n)
+        b.loop.run_until_complete(unreact())
+
+        b.run('command.음식추천', lambda: bot.recommend_food(FakeContext(author=FakeUser()), category=None), size=n)
+        b.run('command.음식추천[검색]', lambda: bot.recommend_food(FakeContext(author=FakeUser()), category='돈가스 국밥'),
+              size=n)
+        b.run('command.AI추천', lambda: bot.ai_recommend_food(FakeContext(author=FakeUser()), category=None), size=n)
+
+        drain(b.loop, bot)
+        db.close()
+
+# 결과
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, threshold):
+    """이전 결과보다 p50이 threshold배 넘게 느려진 항목 목록"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    old = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        before = old.get((r['name'], r['size']))
+        if not before or before['p50_ms'] <= 0:
+            continue
+        ratio = r['p50_ms'] / before['p50_ms']
+        marker = '  <-- 느려짐' if ratio > threshold else ''
+        print(f"{r['name']:<40} size={str(r['size']):>6}  {before['p50_ms']:9.3f}ms -> {r['p50_ms']:9.3f}ms "
+              f"(x{ratio:.2f}){marker}", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append({**r, 'baseline_p50_ms': before['p50_ms'], 'ratio': ratio})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='filters', action='append', default=[], help='이름에 이 문자열이 들어간 벤치마크만')
+    parser.add_argument('-o', '--output', default=str(REPO_DIR / 'bench_results.json'), help='결과 JSON 경로 (-면 stdout)')
+    parser.add_argument('--quick', action='store_true', help='작은 크기만')
+    parser.add_argument('--min-time', type=float, default=0.2, help='항목당 최소 측정 시간(초)')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=1.25, help='이 배수보다 느려지면 회귀로 봄')
+    args = parser.parse_args()
+    output = args.output if args.output == '-' else str(Path(args.output).resolve())
+    baseline = str(Path(args.compare).resolve()) if args.compare else None
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    scales = [1, 10] if args.quick else [1, 10, 100]
+    b = Bench(args.filters, min_time=args.min_time)
+    asyncio.set_event_loop(b.loop)
+
+    with tempfile.TemporaryDirectory(prefix='lunch_bench_') as tmp:
+        workdir = Path(tmp)
+        bot = import_bot(workdir)
+        import kakao_image_crawler
+        fixture_date, pages = load_fixtures()
+        freeze_crawler_date(kakao_image_crawler, fixture_date)
+
+        bench_crawler(b, kakao_image_crawler, pages, scales)
+        bench_menu(b, bot, workdir, scales)
+        bench_commands(b, bot, workdir, sizes)
+
+        drain(b.loop, bot)
+        bot.db.close()
+        os.chdir(REPO_DIR)
+    b.loop.close()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+        },
+        'results': b.results,
+    }
+    regressions = compare(b.results, baseline, args.threshold) if baseline else []
+    if regressions:
+        report['regressions'] = regressions
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output == '-':
+        print(text)
+    else:
+        Path(output).write_text(text + '\n', encoding='utf-8')
+        print(f"결과 저장: {output}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
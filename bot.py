@@ -1,24 +1,38 @@
 import discord
 from discord.ext import commands
-from datetime import datetime
+from datetime import datetime, timedelta
 import requests
 import io
 import logging
 import os
 from dotenv import load_dotenv
-from kakao_image_crawler import crawl_kakao_images, crawl_kakao_images_dinner
+from kakao_image_crawler import crawl_menu_results, stored_menu_results, close_http_session, image_store, KAKAO_URLS, DINNER_KAKAO_URLS, MAX_WORKERS, CHANNEL_TIMEOUT
+from crawl_cache import CrawlCache
+from browser_pool import BrowserPool
+from attachment_cache import AttachmentCache
+from restaurant_store import RestaurantStore
+from lunch_db import LunchDB
+from leaderboard import Leaderboard
+from description_cache import DescriptionCache
+from restaurant_index import RestaurantIndex
+from recommender import Recommender
+from business_hours import BusinessHoursIndex
+from log_pipeline import setup_logging, EventLogWriter
+import metrics
+import image_processor
 from collections import defaultdict
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import pytz
-import json
-import random
 from discord import Embed
 from openai import AsyncOpenAI
 import asyncio
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging (console + file)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s:%(message)s',
-                    handlers=[logging.FileHandler('bot.log', encoding='utf-8'), logging.StreamHandler()])
+# 로그는 큐에 넣고 별도 스레드에서 bot.log에 씀
+log_listener = setup_logging('bot.log')
 
 # Load environment variables
 load_dotenv()
@@ -33,9 +47,55 @@ if not TOKEN:
     exit(1)
 
 
-# Load restaurant data
-with open('restaurants.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# SQLite 저장소 (처음 실행하면 restaurants.json / recommend_log.jsonl을 가져옴)
+db = LunchDB(os.getenv('LUNCH_DB_PATH', 'lunch_bot.db'))
+db.import_legacy('restaurants.json', 'recommend_log.jsonl')
+# 명령어/반응 처리 중의 DB 작업은 전용 스레드 하나에서 (이벤트 루프를 막지 않고 순서도 유지)
+db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db')
+
+def run_db(func, *args):
+    return asyncio.get_running_loop().run_in_executor(db_executor, func, *args)
+# 추천 이력은 모아서 recommend_log.jsonl과 DB에 한 번에 저장
+event_log = EventLogWriter('recommend_log.jsonl', on_batch=db.log_recommendations)
+
+# Load restaurant data (메모리에 올려두고 변경분은 모아서 저장)
+restaurant_store = RestaurantStore(backend=db)
+
+# 리더보드는 메모리에서 추천 수 변경 때마다 갱신
+leaderboard = Leaderboard()
+leaderboard.rebuild(restaurant_store.all())
+leaderboard.load_votes(db.votes_since((datetime.now() - leaderboard.window).isoformat()))
+restaurant_store.add_listener(leaderboard.update)
+restaurant_store.add_reload_listener(leaderboard.rebuild)
+
+# 카테고리/가게 이름/메뉴 키워드 검색 인덱스 (목록이 다시 로드되면 새로 만듦)
+restaurant_index = RestaurantIndex(restaurant_store.all())
+restaurant_store.add_reload_listener(restaurant_index.rebuild)
+
+# 가중치 추천 엔진 (날짜/서버별 난수, 최근 추천한 가게는 피함)
+recommender = Recommender(restaurant_store.all())
+recommender.load_history(db.recommendation_history((datetime.now() - recommender.suppress_window).isoformat()))
+restaurant_store.add_listener(recommender.update)
+restaurant_store.add_reload_listener(recommender.rebuild)
+
+# 영업시간 인덱스 (지금 문 연 가게만 추천)
+hours_index = BusinessHoursIndex(restaurant_store.all())
+restaurant_store.add_reload_listener(hours_index.rebuild)
+
+# AI 추천 설명 캐시 (가게, 프롬프트 버전, 날짜 단위)
+DESCRIPTION_PROMPT_VERSION = 1  # generate_description 프롬프트를 바꾸면 올려서 캐시를 새로 만들기
+description_cache = DescriptionCache('description_cache.json', version=DESCRIPTION_PROMPT_VERSION)
+PREGENERATE_DESCRIPTIONS = os.getenv('PREGENERATE_DESCRIPTIONS') == '1'
+
+# !AI추천 스트리밍 설정
+AI_STREAMING = os.getenv('AI_STREAMING', '1') == '1'
+AI_STREAM_TIMEOUT = 8.0  # 이 시간(초) 안에 설명이 안 끝나면 기본 설명으로
+AI_STREAM_EDIT_INTERVAL = 1.2  # 메시지 수정 최소 간격(초)
+
+# 메트릭 내보내기 (METRICS_PORT면 /metrics 엔드포인트, METRICS_DUMP_PATH면 1분마다 파일로)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0')) or None
+METRICS_DUMP_PATH = os.getenv('METRICS_DUMP_PATH')
+metrics_runner = None
 
 # Discord settings
 intents = discord.Intents.default()
@@ -44,49 +104,350 @@ intents.message_content = True
 # intents.members = True
 bot = commands.Bot(command_prefix='!', intents=intents)
 
-today_menu_lunch_images = None  # 전역 변수로 선언
-toady_menu_dinner_images = None 
 KST = pytz.timezone('Asia/Seoul')
 
+# 끼니별 크롤링 채널, 스케줄 크롤링 시각, 못 받은 채널을 다시 확인하는 마감 시각
+MEALS = {
+    'lunch': {'name': '점심', 'channels': KAKAO_URLS, 'crawl_at': (9, 55), 'poll_until': (13, 30)},
+    'dinner': {'name': '저녁', 'channels': DINNER_KAKAO_URLS, 'crawl_at': (16, 55), 'poll_until': (19, 30)},
+}
+# 채널별 크롤링 결과 캐시 (재시작해도 오늘 결과는 파일에서 다시 읽음)
+crawl_cache = CrawlCache()
+crawl_cache.load(datetime.now(KST).strftime("%Y-%m-%d"))
+MENU_REFRESH_TIMEOUT = 60  # 캐시에 아무것도 없을 때 명령어가 크롤링을 기다리는 최대 시간(초)
+menu_refreshes = {}  # 끼니 -> 진행 중인 크롤링 Task
+# 스케줄 크롤링 뒤에도 메뉴를 못 받은 채널만 간격을 늘려가며 다시 확인 (분, 마지막 간격은 반복)
+MENU_POLL_BACKOFF = (2, 5, 10)
+menu_subscribers = {}  # (날짜, 끼니) -> {디스코드 채널 id: 채널}, 메뉴가 덜 나왔을 때 물어본 채널
+
+# on_ready는 재연결할 때마다 다시 불리므로 스케줄러는 한 번만 시작
+scheduler = AsyncIOScheduler(timezone=KST)
 
-today_date = datetime.now(KST).strftime("%Y-%m-%d") # 오늘 날짜  인트형으로 변경해서 seed 지정
-today_date = int(today_date.replace("-", ""))
-random.seed(today_date)
 
 lock = asyncio.Lock()
+RECONCILE_WINDOW = timedelta(days=2)  # 이 기간 안에 보낸 추천 메시지만 보정
+
+# 스케줄 크롤링이 같이 쓰는 브라우저 풀 (처음 크롤링할 때 브라우저를 띄움)
+browser_pool = BrowserPool(size=MAX_WORKERS, page_load_timeout=CHANNEL_TIMEOUT)
+
+# 오늘 업로드한 메뉴 이미지 URL 캐시 (MENU_CACHE_CHANNEL_ID가 있으면 크롤링 직후 미리 업로드)
+attachment_cache = AttachmentCache()
+MENU_CACHE_CHANNEL_ID = int(os.getenv('MENU_CACHE_CHANNEL_ID', '0')) or None
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_FILES_PER_MESSAGE = 10
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 메시지 하나당 업로드 용량 제한
 
 async def scheduled_lunch_crawl():
-    global today_menu_lunch_images
-    loop = bot.loop
-    today_menu_lunch_images = await loop.run_in_executor(None, crawl_kakao_images)
-    logging.info(f"[스케줄] 오늘의 메뉴 이미지 미리 로드 완료: {today_menu_lunch_images}")
+    channels = await refresh_menu('lunch')
+    logging.info(f"[스케줄] 오늘의 점심 메뉴 이미지 미리 로드 완료: {channels}")
+    schedule_menu_poll('lunch')
 
 async def scheduled_dinner_crawl():
-    global toady_menu_dinner_images
-    loop = bot.loop
-    toady_menu_dinner_images = await loop.run_in_executor(None, crawl_kakao_images_dinner)
-    logging.info(f"[스케줄] 오늘의 메뉴 이미지 미리 로드 완료: {toady_menu_dinner_images}")
+    channels = await refresh_menu('dinner')
+    logging.info(f"[스케줄] 오늘의 저녁 메뉴 이미지 미리 로드 완료: {channels}")
+    schedule_menu_poll('dinner')
+
+def meal_time(meal, key, now):
+    hour, minute = MEALS[meal][key]
+    return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+def schedule_menu_poll(meal, attempt=0):
+    """못 받은 채널이 남아 있으면 다음 확인을 예약 (끼니마다 예약은 하나만)"""
+    now = datetime.now(KST)
+    missing = crawl_cache.missing_channels(today_str(), meal, MEALS[meal]['channels'])
+    if not missing:
+        return
+    run_date = now + timedelta(minutes=MENU_POLL_BACKOFF[min(attempt, len(MENU_POLL_BACKOFF) - 1)])
+    if run_date > meal_time(meal, 'poll_until', now):
+        logging.info(f"{MEALS[meal]['name']} 메뉴 확인 종료 (마감 시각), 끝내 못 받은 채널: {missing}")
+        return
+    scheduler.add_job(poll_menu, 'date', run_date=run_date, args=[meal, attempt + 1],
+                      id=f'menu_poll_{meal}', replace_existing=True)
+    logging.info(f"{MEALS[meal]['name']} 메뉴 다시 확인 예약 {run_date:%H:%M}: {missing}")
+
+async def poll_menu(meal, attempt):
+    """아직 메뉴를 못 받은 채널만 다시 크롤링"""
+    missing = crawl_cache.missing_channels(today_str(), meal, MEALS[meal]['channels'])
+    if missing:
+        metrics.inc('menu_poll_total', meal=meal)
+        await refresh_menu(meal, missing)
+    schedule_menu_poll(meal, attempt)
+
+def today_str():
+    return datetime.now(KST).strftime("%Y-%m-%d")
+
+def crawl_and_cache(meal, today, kakao_urls):
+    """(executor에서 실행) 채널들을 크롤링해서 캐시에 반영
+    크롤링 캐시에 항목이 아예 없는 채널은 오늘 이미 받아 둔 이미지가 저장소에 있으면 그것을 씀"""
+    unknown = [key for key in kakao_urls if crawl_cache.get(today, meal, key) is None]
+    results = stored_menu_results(unknown, meal)
+    if results:
+        logging.info(f"{MEALS[meal]['name']} 메뉴 저장소에서 복구: {list(results)}")
+        crawl_cache.put_many(today, meal, results)
+    kakao_urls = {key: url for key, url in kakao_urls.items() if key not in results}
+    if not kakao_urls:
+        return results
+    with metrics.timer('crawl_seconds', meal=meal):
+        crawled = crawl_menu_results(kakao_urls, (meal,), pool=browser_pool)[meal]
+    crawl_cache.put_many(today, meal, crawled)
+    return {**results, **crawled}
+
+async def refresh_menu(meal, targets=None):
+    """캐시에 없거나 stale/만료된 채널(targets를 주면 그 채널들)만 다시 크롤링하고 크롤링한 채널 목록 반환
+    같은 끼니 크롤링은 한 번에 하나만 돌고, 동시에 부르면 그 결과를 같이 기다린다."""
+    task = menu_refreshes.get(meal)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh_menu(meal, targets))
+        menu_refreshes[meal] = task
+    return await asyncio.shield(task)
+
+async def _refresh_menu(meal, targets=None):
+    today = today_str()
+    channels = MEALS[meal]['channels']
+    if targets is None:
+        targets = crawl_cache.channels_to_refresh(today, meal, channels)
+    if not targets:
+        return []
+    missing_before = set(crawl_cache.missing_channels(today, meal, channels))
+    logging.info(f"{MEALS[meal]['name']} 메뉴 크롤링: {targets}")
+    try:
+        await asyncio.get_running_loop().run_in_executor(
+            None, crawl_and_cache, meal, today, {key: channels[key] for key in targets})
+    except Exception as e:
+        logging.error(f"{MEALS[meal]['name']} 메뉴 크롤링 실패: {e}", exc_info=True)
+        return []
+    images = crawl_cache.images(today, meal, channels)
+    await warm_attachment_cache(images)
+    # 전에 못 받았다가 이번에 받은 채널은 물어봤던 채널들에 다시 보내줌
+    arrived = [image for image in images if image[0] in missing_before and not image[2]]
+    if arrived:
+        await notify_menu_subscribers(meal, today, arrived)
+    return targets
+
+def subscribe_menu_updates(meal, channel):
+    """메뉴가 덜 나왔을 때 물어본 채널 기억 (오늘 것만)"""
+    today = today_str()
+    for key in [key for key in menu_subscribers if key[0] != today]:
+        del menu_subscribers[key]
+    menu_subscribers.setdefault((today, meal), {})[channel.id] = channel
+
+async def notify_menu_subscribers(meal, today, images):
+    subscribers = menu_subscribers.get((today, meal))
+    if not subscribers:
+        return
+    meal_name = MEALS[meal]['name']
+    if not crawl_cache.missing_channels(today, meal, MEALS[meal]['channels']):
+        # 다 받았으면 더 보낼 것이 없음
+        menu_subscribers.pop((today, meal), None)
+    for channel in list(subscribers.values()):
+        try:
+            await channel.send(f"🔔 늦게 올라온 오늘의 {meal_name} 메뉴입니다!")
+            await send_menu_images(channel, images, meal_name)
+        except discord.HTTPException as e:
+            logging.error(f"{meal_name} 메뉴 업데이트 전송 실패 (채널 {channel.id}): {e}")
+
+async def get_menu_images(meal):
+    """오늘 메뉴 [(채널, 이미지 경로, stale), ...]
+    캐시에 아무것도 없으면 크롤링을 기다리고, 빠졌거나 stale인 채널만 있으면 있는 것으로 답하고 뒤에서 다시 크롤링"""
+    today = today_str()
+    channels = MEALS[meal]['channels']
+    if crawl_cache.channels_to_refresh(today, meal, channels):
+        if crawl_cache.images(today, meal, channels):
+            asyncio.create_task(refresh_menu(meal))
+        else:
+            try:
+                await asyncio.wait_for(refresh_menu(meal), MENU_REFRESH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logging.warning(f"{MEALS[meal]['name']} 메뉴 크롤링이 {MENU_REFRESH_TIMEOUT}초 안에 끝나지 않았습니다")
+    return crawl_cache.images(today, meal, channels)
+
+def group_menu_images(images):
+    """[(채널, 이미지 경로, stale), ...]를 중복 제거 후 채널별로 묶기 -> {채널: [(경로, stale), ...]}"""
+    grouped = defaultdict(list)
+    seen = set()
+    for channel, img_path, stale in images:
+        if img_path in seen:
+            continue
+        seen.add(img_path)
+        grouped[channel].append((img_path, stale))
+    return grouped
+
+def menu_items(grouped, meal_name):
+    """(임베드 제목, 이미지 경로) 목록, 제목은 채널별 첫 이미지에만"""
+    items = []
+    for channel, images in grouped.items():
+        for i, (img_path, stale) in enumerate(images):
+            title = None
+            if i == 0 and stale:
+                title = f"⚠️ {channel} 오늘의 {meal_name} 메뉴를 아직 가져오지 못했어요 (다시 확인 중)"
+            elif i == 0:
+                title = f"🍽️ {channel} 오늘의 {meal_name} 메뉴입니다!"
+            items.append((title, img_path))
+    return items
+
+def build_menu_embeds(items, urls):
+    """제목 + 이미지 URL로 임베드 목록 생성"""
+    embeds = []
+    for title, img_path in items:
+        embed = Embed(title=title)
+        embed.set_image(url=urls[img_path])
+        embeds.append(embed)
+    return embeds
+
+def chunk_menu_items(items):
+    """메시지 하나에 들어갈 만큼(파일 10개, 업로드 용량 제한)씩 나누기"""
+    chunks, current, current_size = [], [], 0
+    for item in items:
+        size = os.path.getsize(item[1])
+        if current and (len(current) >= MAX_FILES_PER_MESSAGE or current_size + size > MAX_UPLOAD_BYTES):
+            chunks.append(current)
+            current, current_size = [], 0
+        current.append(item)
+        current_size += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+def read_menu_files(chunk):
+    """이미지 파일을 메모리로 읽기 (executor에서 실행)"""
+    contents = []
+    for _, img_path in chunk:
+        with open(img_path, 'rb') as f:
+            contents.append(f.read())
+    return contents
+
+async def upload_menu_images(target, items, today):
+    """이미지를 메시지당 최대 10장씩 첨부해서 보내고, 업로드된 URL은 캐시
+    다음 묶음 파일 읽기는 현재 묶음을 보내는 동안 미리 해둔다."""
+    chunks = chunk_menu_items(items)
+    loop = asyncio.get_running_loop()
+    next_read = loop.run_in_executor(None, read_menu_files, chunks[0])
+    for n, chunk in enumerate(chunks):
+        contents = await next_read
+        if n + 1 < len(chunks):
+            next_read = loop.run_in_executor(None, read_menu_files, chunks[n + 1])
+
+        # 첨부파일 이름은 ascii로 (attachment:// 참조가 깨지지 않도록)
+        names = {img_path: f"menu_{i}{os.path.splitext(img_path)[1] or '.jpg'}" for i, (_, img_path) in enumerate(chunk)}
+        files = [discord.File(io.BytesIO(content), filename=names[img_path]) for (_, img_path), content in zip(chunk, contents)]
+        embeds = build_menu_embeds(chunk, {p: f"attachment://{name}" for p, name in names.items()})
+        with metrics.timer('discord_send_seconds', kind='menu_upload'):
+            msg = await target.send(embeds=embeds, files=files)
+
+        paths_by_name = {name: p for p, name in names.items()}
+        for attachment in msg.attachments:
+            img_path = paths_by_name.get(attachment.filename)
+            if img_path:
+                attachment_cache.put(img_path, attachment.url, today)
+
+async def send_menu_images(ctx, images, meal_name):
+    grouped = group_menu_images(images)
+    items = menu_items(grouped, meal_name)
+    today = today_str()
+
+    # 오늘 이미 올린 이미지면 캐시된 URL로 한 메시지에 보내기
+    urls = attachment_cache.get_all([img_path for _, img_path in items], today)
+    if urls:
+        embeds = build_menu_embeds(items, urls)
+        for i in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+            with metrics.timer('discord_send_seconds', kind='menu_cached'):
+                await ctx.send(embeds=embeds[i:i + MAX_EMBEDS_PER_MESSAGE])
+        return
+
+    # 3. 처음 보내는 이미지는 첨부파일로 묶어서 업로드
+    await upload_menu_images(ctx, items, today)
+
+async def warm_attachment_cache(images):
+    """크롤링 직후 캐시 채널에 미리 업로드해서 첫 명령어도 캐시로 응답"""
+    if not MENU_CACHE_CHANNEL_ID or not images:
+        return
+    channel = bot.get_channel(MENU_CACHE_CHANNEL_ID)
+    if channel is None:
+        logging.warning(f"메뉴 캐시 채널을 찾을 수 없습니다: {MENU_CACHE_CHANNEL_ID}")
+        return
+    today = today_str()
+    paths = dict.fromkeys(img_path for _, img_path, _ in images)
+    items = [(None, img_path) for img_path in paths if not attachment_cache.get(img_path, today)]
+    if items:
+        await upload_menu_images(channel, items, today)
+    logging.info(f"[스케줄] 메뉴 이미지 첨부파일 캐시 완료: {len(images)}개")
 
 @bot.event
 async def on_ready():
-    global today_menu_lunch_images
     logging.info(f'Logged in as {bot.user} (ID: {bot.user.id})')
     logging.info('Bot is ready to receive commands.')
     print('------')
     print(f'Logged in as {bot.user} (ID: {bot.user.id})')
     print('Bot is ready!')
     print('------')
-    # 스케줄러 설정
-    scheduler = AsyncIOScheduler(timezone=KST)
-    scheduler.add_job(scheduled_lunch_crawl, 'cron', day_of_week='mon-fri', hour=9, minute=55)
-    logging.info('Scheduled job for scheduled_lunch_crawl at 09:55 mon-fri.')
-    scheduler.add_job(scheduled_dinner_crawl, 'cron', day_of_week='mon-fri', hour=16, minute=55)
-    logging.info('Scheduled job for scheduled_dinner_crawl at 17:30 mon-fri.')
+    start_scheduler()
+    await start_metrics_server()
+
+def start_scheduler():
+    """스케줄러 설정 (재연결로 on_ready가 다시 불려도 작업이 겹치지 않도록 한 번만)"""
+    if scheduler.running:
+        logging.info('Scheduler already running, skipping job setup.')
+        return
+    for meal, job in (('lunch', scheduled_lunch_crawl), ('dinner', scheduled_dinner_crawl)):
+        hour, minute = MEALS[meal]['crawl_at']
+        scheduler.add_job(job, 'cron', day_of_week='mon-fri', hour=hour, minute=minute,
+                          id=job.__name__, replace_existing=True)
+        logging.info(f'Scheduled job for {job.__name__} at {hour:02d}:{minute:02d} mon-fri.')
+    scheduler.add_job(reconcile_votes, 'interval', minutes=30, id='reconcile_votes', replace_existing=True)
+    logging.info('Scheduled job for reconcile_votes every 30 minutes.')
+    if PREGENERATE_DESCRIPTIONS:
+        scheduler.add_job(pregenerate_descriptions, 'cron', hour=6, minute=0,
+                          id='pregenerate_descriptions', replace_existing=True)
+        logging.info('Scheduled job for pregenerate_descriptions at 06:00.')
+    scheduler.add_job(gc_images, 'cron', hour=3, minute=0, id='gc_images', replace_existing=True)
+    logging.info(f'Scheduled job for gc_images at 03:00 (retention {image_store.retention_days} days).')
+    if METRICS_DUMP_PATH:
+        scheduler.add_job(dump_metrics, 'interval', minutes=1, id='dump_metrics', replace_existing=True)
+        logging.info(f'Scheduled job for dump_metrics every minute: {METRICS_DUMP_PATH}')
     scheduler.start()
+    # 스케줄 크롤링 시각이 지나서 켜졌으면 못 받은 채널 확인을 바로 이어감
+    now = datetime.now(KST)
+    if now.weekday() < 5:
+        for meal in MEALS:
+            if meal_time(meal, 'crawl_at', now) <= now < meal_time(meal, 'poll_until', now):
+                scheduler.add_job(poll_menu, 'date', run_date=now, args=[meal, 0],
+                                  id=f'menu_poll_{meal}', replace_existing=True)
+
+async def gc_images():
+    """보관 기간이 지난 메뉴 이미지 정리"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, image_store.gc)
+    except OSError as e:
+        logging.error(f"이미지 저장소 정리 실패: {e}")
+
+async def dump_metrics():
+    await asyncio.get_running_loop().run_in_executor(None, metrics.dump, METRICS_DUMP_PATH)
+
+async def start_metrics_server():
+    global metrics_runner
+    if not METRICS_PORT or metrics_runner is not None:
+        return
+    try:
+        metrics_runner = await metrics.start_http_server(METRICS_PORT)
+        logging.info(f'메트릭 엔드포인트: http://0.0.0.0:{METRICS_PORT}/metrics')
+    except OSError as e:
+        logging.error(f"메트릭 엔드포인트를 열지 못했습니다: {e}")
+
+# 명령어별 처리 시간/횟수
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.metrics_started = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_timer(ctx):
+    name = ctx.command.qualified_name if ctx.command else 'unknown'
+    started = getattr(ctx, 'metrics_started', None)
+    if started is not None:
+        metrics.observe('command_seconds', time.perf_counter() - started, command=name)
+    metrics.inc('commands_total', command=name, status='error' if ctx.command_failed else 'ok')
 
 @bot.command(name='점심')
 async def send_lunch_menu(ctx):
-    global today_menu_lunch_images
     now = datetime.now(KST)
     # 평일만 뽑기
     if now.weekday() >= 5:
@@ -96,71 +457,92 @@ async def send_lunch_menu(ctx):
         await ctx.send("⏰ 점심 메뉴는 오전 10시부터 확인할 수 있습니다!")
         return
     await ctx.send("🍱 오늘의 점심 메뉴를 불러오는 중입니다...")
-    if not today_menu_lunch_images:
-        await ctx.send("❌ 메뉴 정보를 가져오지 못했습니다. 로그를 확인해주세요.")
+    images = await get_menu_images('lunch')
+    if crawl_cache.missing_channels(today_str(), 'lunch', KAKAO_URLS):
+        subscribe_menu_updates('lunch', ctx.channel)
+    if not images:
+        await ctx.send("❌ 메뉴 정보를 가져오지 못했습니다. 올라오면 이 채널로 보내드릴게요.")
         return
 
-    # 1. Remove duplicates
-    unique_images = list(set(today_menu_lunch_images))
-
-    # 2. Group by restaurant name (before first underscore)
-    grouped = defaultdict(list)
-    for img_path in unique_images:
-        filename = os.path.basename(img_path)
-        restaurant = filename.split('_')[0]
-        grouped[restaurant].append(img_path)
-
-    # 3. Send restaurant name, then images
-    for restaurant, images in grouped.items():
-        await ctx.send(f"🍽️ {restaurant} 오늘의 점심 메뉴입니다!")
-        for img_path in images:
-            with open(img_path, 'rb') as f:
-                await ctx.send(file=discord.File(f))
+    await send_menu_images(ctx, images, "점심")
 
 @bot.command(name='저녁')
 async def send_dinner_menu(ctx):
-    global today_menu_lunch_images
     now = datetime.now(KST)
     if now.hour < 17:
         await ctx.send("⏰ 저녁 메뉴는 오후 5시부터 확인할 수 있습니다!")
         return
-    
-    if not toady_menu_dinner_images:
-        await ctx.send("❌ 메뉴 정보를 가져오지 못했습니다. 로그를 확인해주세요.")
+
+    images = await get_menu_images('dinner')
+    if crawl_cache.missing_channels(today_str(), 'dinner', DINNER_KAKAO_URLS):
+        subscribe_menu_updates('dinner', ctx.channel)
+    if not images:
+        await ctx.send("❌ 메뉴 정보를 가져오지 못했습니다. 올라오면 이 채널로 보내드릴게요.")
         return
-    
-    # 1. Remove duplicates
-    unique_images = list(set(toady_menu_dinner_images))
 
-    # 2. Group by restaurant name (before first underscore)
-    grouped = defaultdict(list)
-    for img_path in unique_images:
-        filename = os.path.basename(img_path)
-        restaurant = filename.split('_')[0]
-        grouped[restaurant].append(img_path)
-
-    # 3. Send restaurant name, then images
-    for restaurant, images in grouped.items():
-        await ctx.send(f"🍽️ {restaurant} 오늘의 저녁 메뉴입니다!")
-        for img_path in images:
-            with open(img_path, 'rb') as f:
-                await ctx.send(file=discord.File(f))
-                
+    await send_menu_images(ctx, images, "저녁")
+
 # AI 추천 음식     
 # GPT 음식 설명 생성
-async def generate_description(food_name: str):
+def description_messages(food_name: str):
     prompt = f"{food_name}에 대해 맛있고 유쾌한 설명을 2~3문장으로 해줘 끝맺음으로. 그리고 먹고 싶게 만들어줘!"
+    return [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+@metrics.timed('openai_request_seconds', mode='complete')
+async def generate_description(food_name: str):
     response = await client.chat.completions.create(
         model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ],
+        messages=description_messages(food_name),
         max_tokens=150,
         temperature=0.7
     )
     return response.choices[0].message.content.strip()
 
+async def stream_description(food_name: str, on_text):
+    """스트리밍으로 설명 생성, 토큰이 올 때마다 지금까지의 글을 on_text로 전달"""
+    started = time.perf_counter()
+    stream = await client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=description_messages(food_name),
+        max_tokens=150,
+        temperature=0.7,
+        stream=True
+    )
+    text = ''
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            if not text:
+                metrics.observe('openai_first_token_seconds', time.perf_counter() - started)
+            text += delta
+            on_text(text)
+    metrics.observe('openai_request_seconds', time.perf_counter() - started, mode='stream')
+    return text.strip()
+
+def fallback_description(store_name: str):
+    return f"오늘은 {store_name} 어떠세요? 든든하게 한 끼 하고 오후도 힘내봐요! 😋"
+
+# 캐시된 설명이 있으면 재사용, 같은 가게를 동시에 요청하면 GPT 호출은 한 번만
+async def get_description(store_name: str):
+    return await description_cache.get_or_create(store_name, lambda: generate_description(store_name))
+
+async def pregenerate_descriptions():
+    """모든 가게 설명을 미리 만들어 둠 (PREGENERATE_DESCRIPTIONS=1이면 매일 새벽 실행)"""
+    semaphore = asyncio.Semaphore(3)
+
+    async def describe(store_name):
+        async with semaphore:
+            try:
+                await get_description(store_name)
+            except Exception as e:
+                logging.error(f"{store_name} 설명 생성 실패: {e}")
+
+    await asyncio.gather(*(describe(r['store_name']) for r in restaurant_store.all()))
+    logging.info(f"[스케줄] 음식점 설명 미리 생성 완료: {len(restaurant_store.all())}개")
+
 # GPT에게 메뉴명을 입력 받아 해당 음식점 추론 안됨 
 # async def gpt_find_store_by_menu(menu_name: str):
 #     menu_list = "\n".join([f"- {r['store_name']} ({r['category']})" for r in data])
@@ -180,36 +562,127 @@ async def generate_description(food_name: str):
 #     )
 #     return response.choices[0].message.content.strip()
 
-# AI 추천 음식 선택 (비동기)
-async def get_ai_recommend_food(category=None):
-    filtered = [r for r in data if r['category'] == category] if category else data
-    if not filtered:
+def record_recommendation(ctx, restaurant):
+    """추천 기록 (같은 사용자/채널에 같은 가게가 연달아 나오지 않도록)"""
+    log_entry = {
+        "user_id": ctx.author.id,
+        "username": str(ctx.author),
+        "store_name": restaurant['store_name'],
+        "category": restaurant['category'],
+        "timestamp": datetime.now().isoformat(),
+        "channel_id": ctx.channel.id,
+        "guild_id": ctx.guild.id if ctx.guild else None
+    }
+    recommender.record(restaurant['store_name'], ctx.author.id, ctx.channel.id)
+    event_log.log(log_entry)
+    logging.info(f"추천 로그 기록: {log_entry}")
+
+def pick_open(candidates=None, ctx=None):
+    """후보(None이면 전체) 중 지금 영업 중인 가게를 추천, (가게, 영업 중인지)
+    하나도 없으면 영업시간을 무시하고 추천 (임베드에 영업시간이 아니라고 표시)"""
+    ids = (ctx.author.id, ctx.channel.id, ctx.guild.id if ctx.guild else None) if ctx is not None else ()
+    restaurant = recommender.pick(candidates, *ids, predicate=hours_index.open_predicate())
+    if restaurant is not None:
+        return restaurant, True
+    logging.info("지금 영업 중인 후보가 없어 영업시간을 무시하고 추천합니다")
+    return recommender.pick(candidates, *ids), False
+
+def mark_closed(embed):
+    embed.add_field(name='⏰ 지금은 영업시간이 아니에요', value='지금 문 연 가게가 없어서 영업시간과 상관없이 골랐어요', inline=False)
+
+# AI 추천 음식 선택
+def pick_ai_recommend_food(category=None, ctx=None):
+    filtered = restaurant_index.by_category(category) if category else None
+    if category and not filtered:
+        return None, False
+    return pick_open(filtered, ctx)
+
+# AI 추천 음식 선택 + 설명 (비동기)
+async def get_ai_recommend_food(category=None, ctx=None):
+    today_restaurant, _ = pick_ai_recommend_food(category, ctx)
+    if today_restaurant is None:
         return None, None
-    today_restaurant = random.choice(filtered)
-    description = await generate_description(today_restaurant['store_name'])
+    description = await get_description(today_restaurant['store_name'])
     return today_restaurant, description
 
+def build_ai_embed(today_restaurant, description, is_open=True):
+    embed = Embed(
+        title=f'🍱 AI 추천 메뉴: {today_restaurant["store_name"]}',
+        description=description or "🤖 ..."
+    )
+    embed.add_field(name='카테고리', value=today_restaurant['category'], inline=True)
+    embed.add_field(name='평점', value=str(today_restaurant['rating']), inline=True)
+    embed.add_field(name='전화번호', value=today_restaurant.get('tell_num', today_restaurant.get('phone_num', '없음')), inline=False)
+    embed.add_field(name='영업시간', value=today_restaurant['business_hours'], inline=False)
+    if not is_open:
+        mark_closed(embed)
+    return embed
+
+class ThrottledEmbedEditor:
+    """스트리밍 중인 글을 메시지에 반영하되, 수정은 interval초에 한 번만 (디스코드 수정 제한)"""
+    def __init__(self, message, build_embed, interval=AI_STREAM_EDIT_INTERVAL):
+        self.message = message
+        self.build_embed = build_embed
+        self.interval = interval
+        self._latest = None
+        self._last_edit = 0.0
+        self._task = None
+        self._closed = False
+
+    def update(self, text):
+        if self._closed:
+            return
+        self._latest = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._edit_later())
+
+    async def _edit_later(self):
+        wait = self._last_edit + self.interval - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_edit = time.monotonic()
+        try:
+            await self.message.edit(content=None, embed=self.build_embed(self._latest))
+        except discord.HTTPException as e:
+            logging.warning(f"AI 추천 메시지 수정 실패: {e}")
+
+    async def finish(self, text):
+        """진행 중인 중간 수정을 정리하고 최종 글로 수정"""
+        self._closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            # 이미 보낸 중간 수정이 최종 수정보다 늦게 도착하지 않도록 끝날 때까지 기다림
+            # (asyncio.wait는 태스크의 CancelledError를 올리지 않고, finish 자체가 취소되면 그건 그대로 전달됨)
+            await asyncio.wait([self._task])
+        await self.message.edit(content=None, embed=self.build_embed(text))
+
 # 디스코드 명령어
 @bot.command('AI추천')
 async def ai_recommend_food(ctx, *, category: str = None):
     loading_message = await ctx.send("🤖 AI가 오늘의 메뉴를 고민 중입니다...")
 
-    today_restaurant, today_description = await get_ai_recommend_food(category)
+    today_restaurant, is_open = pick_ai_recommend_food(category, ctx)
 
     if today_restaurant is None:
         await loading_message.edit(content="AI가 추천할 음식점을 찾지 못했어요 😢")
         return
+    record_recommendation(ctx, today_restaurant)
 
-    embed = Embed(
-        title=f'🍱 AI 추천 메뉴: {today_restaurant["store_name"]}',
-        description=today_description
-    )
-    embed.add_field(name='카테고리', value=today_restaurant['category'], inline=True)
-    embed.add_field(name='평점', value=str(today_restaurant['rating']), inline=True)
-    embed.add_field(name='전화번호', value=today_restaurant.get('tell_num', today_restaurant.get('phone_num', '없음')), inline=False)
-    embed.add_field(name='영업시간', value=today_restaurant['business_hours'], inline=False)
+    store_name = today_restaurant['store_name']
+    editor = ThrottledEmbedEditor(loading_message, lambda text: build_ai_embed(today_restaurant, text, is_open))
+    if AI_STREAMING:
+        factory = lambda: stream_description(store_name, editor.update)
+    else:
+        factory = lambda: generate_description(store_name)
+    try:
+        # 캐시에 있으면 바로, 없으면 스트리밍하면서 중간 결과를 보여줌
+        today_description = await asyncio.wait_for(description_cache.get_or_create(store_name, factory), AI_STREAM_TIMEOUT)
+    except Exception as e:
+        # 시간 초과/오류면 캐시 또는 기본 문구 (생성은 뒤에서 계속되어 캐시에 저장됨)
+        logging.warning(f"AI 설명 생성 실패, 기본 설명 사용: {store_name} ({e!r})")
+        today_description = description_cache.get(store_name) or fallback_description(store_name)
 
-    await loading_message.edit(content=None, embed=embed)
+    await editor.finish(today_description)
 
     logging.info(f"!AI음식추천 명령 실행 by {ctx.author} (ID: {ctx.author.id}), category: {category}")    
 
@@ -217,15 +690,20 @@ async def ai_recommend_food(ctx, *, category: str = None):
 async def recommend_food(ctx, *, category: str = None):
     logging.info(f"!음식추천 명령 실행 by {ctx.author} (ID: {ctx.author.id}), category: {category}")
     # Filter by category if provided
+    # 여러 단어는 하나라도 걸리면(OR), '&'가 있으면 모두 걸리는(AND) 가게
     if category:
         keywords = category.split()
-        filtered = [r for r in data if any(kw in r['category'] for kw in keywords)]
+        mode = 'and' if '&' in keywords else 'or'
+        filtered = restaurant_index.search([kw for kw in keywords if kw != '&'], mode)
+        if not filtered:
+            await ctx.send(f'해당 카테고리의 음식점이 없습니다: {category}')
+            return
     else:
-        filtered = data
-    if not filtered:
+        filtered = None
+    restaurant, is_open = pick_open(filtered, ctx)
+    if restaurant is None:
         await ctx.send(f'해당 카테고리의 음식점이 없습니다: {category}')
         return
-    restaurant = random.choice(filtered)
     embed = Embed(title=restaurant['store_name'], description=f"카테고리: {restaurant['category']}")
     embed.add_field(name='평점', value=restaurant['rating'])
     embed.add_field(name='방문자 리뷰', value=restaurant['visited_review'])
@@ -233,110 +711,159 @@ async def recommend_food(ctx, *, category: str = None):
     embed.add_field(name='주소', value=restaurant['address'], inline=False)
     embed.add_field(name='전화번호', value=restaurant.get('tell_num', restaurant.get('phone_num', '없음')))
     embed.add_field(name='영업시간', value=restaurant['business_hours'], inline=False)
+    if not is_open:
+        mark_closed(embed)
     embed.set_footer(text=f"추천 수: {restaurant.get('recommand', 0)}")
     msg = await ctx.send(embed=embed)
+    await run_db(db.register_message, msg.id, msg.channel.id, restaurant['store_name'])
     await msg.add_reaction('👍')  # 추천
     await msg.add_reaction('👎')  # 비추천
 
     # Log user recommendation
-    log_entry = {
-        "user_id": ctx.author.id,
-        "username": str(ctx.author),
-        "store_name": restaurant['store_name'],
-        "category": restaurant['category'],
-        "timestamp": datetime.now().isoformat()
-    }
-    with open('recommend_log.jsonl', 'a', encoding='utf-8') as logf:
-        logf.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
-    logging.info(f"추천 로그 기록: {log_entry}")
+    record_recommendation(ctx, restaurant)
+
+# 추천(👍) 집계: 반응 이벤트마다 사용자별 추천을 기록하고 추천 수는 +1/-1만 반영
+# DB 기록은 db_executor에서, 메모리(추천 수, 리더보드) 반영만 이벤트 루프에서
+async def apply_vote(message_id, user_id, store_name):
+    created_at = await run_db(db.add_vote, message_id, user_id, store_name)
+    if created_at:
+        restaurant_store.add_recommand(store_name, 1)
+        leaderboard.add_vote(message_id, user_id, store_name, created_at)
+    return created_at is not None
+
+async def retract_vote(message_id, user_id):
+    removed = await run_db(db.remove_vote, message_id, user_id)
+    if removed:
+        store_name, created_at = removed
+        restaurant_store.add_recommand(store_name, -1)
+        leaderboard.remove_vote(message_id, user_id, store_name, created_at)
+    return removed is not None
+
+@asynccontextmanager
+async def vote_lock(handler):
+    """추천 집계 락 (기다린 시간 기록)"""
+    started = time.perf_counter()
+    async with lock:
+        metrics.observe('vote_lock_wait_seconds', time.perf_counter() - started, handler=handler)
+        yield
+
+def is_bot_reaction(payload):
+    if bot.user and payload.user_id == bot.user.id:
+        return True
+    return payload.member is not None and payload.member.bot
 
 @bot.event
-async def on_reaction_add(reaction, user):
-    if user.bot:
+async def on_raw_reaction_add(payload):
+    if str(payload.emoji) != '👍' or is_bot_reaction(payload):
+        return
+    store_name = await run_db(db.get_message_store, payload.message_id)
+    if not store_name:
         return
-    msg = reaction.message
-    if (
-        msg.embeds
-        and msg.embeds[0].footer
-        and msg.embeds[0].footer.text
-        and msg.embeds[0].footer.text.startswith("추천 수:")
-    ):
-        store_name = msg.embeds[0].title
-        if str(reaction.emoji) == '👍':
-            async with lock:
-                # 실제 메시지의 👍 개수로 카운트
-                count = 0
-                for react in msg.reactions:
-                    if str(react.emoji) == '👍':
-                        users = [u async for u in react.users()]
-                        count = len([u for u in users if not u.bot])
-                with open('restaurants.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for r in data:
-                    if r['store_name'] == store_name:
-                        r['recommand'] = count
-                        break
-                with open('restaurants.json', 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                logging.info(f"{store_name} 추천 카운트 동기화: {count} (by {user})")
+    async with vote_lock('add'):
+        if await apply_vote(payload.message_id, payload.user_id, store_name):
+            recommand = restaurant_store.get(store_name).get('recommand', 0)
+            logging.info(f"{store_name} 추천 +1: {recommand} (by {payload.user_id})")
 
 @bot.event
-async def on_reaction_remove(reaction, user):
-    if user.bot:
+async def on_raw_reaction_remove(payload):
+    if str(payload.emoji) != '👍' or (bot.user and payload.user_id == bot.user.id):
         return
-    msg = reaction.message
-    if (
-        msg.embeds
-        and msg.embeds[0].footer
-        and msg.embeds[0].footer.text
-        and msg.embeds[0].footer.text.startswith("추천 수:")
-    ):
-        store_name = msg.embeds[0].title
-        if str(reaction.emoji) == '👍':
-            async with lock:
-                count = 0
-                for react in msg.reactions:
-                    if str(react.emoji) == '👍':
-                        users = [u async for u in react.users()]
-                        count = len([u for u in users if not u.bot])
-                with open('restaurants.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for r in data:
-                    if r['store_name'] == store_name:
-                        r['recommand'] = count
-                        break
-                with open('restaurants.json', 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                logging.info(f"{store_name} 추천 카운트 동기화(해제): {count} (by {user})")
+    store_name = await run_db(db.get_message_store, payload.message_id)
+    if not store_name:
+        return
+    async with vote_lock('remove'):
+        if await retract_vote(payload.message_id, payload.user_id):
+            recommand = restaurant_store.get(store_name).get('recommand', 0)
+            logging.info(f"{store_name} 추천 -1(해제): {recommand} (by {payload.user_id})")
+
+async def reconcile_votes():
+    """최근 추천 메시지의 실제 👍 목록과 기록을 가끔 맞춤 (봇이 꺼져 있던 동안 놓친 이벤트 등)"""
+    since = (datetime.now() - RECONCILE_WINDOW).isoformat()
+    added = removed = 0
+    for message_id, channel_id, store_name in await run_db(db.recent_messages, since):
+        try:
+            channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+            msg = await channel.fetch_message(message_id)
+        except (discord.NotFound, discord.Forbidden):
+            continue
+        fetched_at = datetime.now()
+        users = set()
+        for react in msg.reactions:
+            if str(react.emoji) == '👍':
+                users = {u.id async for u in react.users() if not u.bot}
+        async with vote_lock('reconcile'):
+            recorded = await run_db(db.message_votes, message_id)
+            for user_id in users - recorded.keys():
+                added += await apply_vote(message_id, user_id, store_name)
+            for user_id, created_at in recorded.items():
+                # 조회 이후에 들어온 추천은 건드리지 않음
+                if user_id not in users and created_at < fetched_at:
+                    removed += await retract_vote(message_id, user_id)
+    if added or removed:
+        logging.info(f"[스케줄] 추천 기록 보정: +{added} / -{removed}")
 
 # 리더보드 
 
 @bot.command()
-async def 리더보드(ctx):
-    with open("restaurants.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # 추천수 기준 내림차순 정렬
-    sorted_data = sorted(data, key=lambda x: x.get("recommand", 0), reverse=True)
-
-    # 상위 5개 추출
-    top5 = sorted_data[:5]
+async def 리더보드(ctx, *, option: str = None):
+    # !리더보드 / !리더보드 주간 / !리더보드 <카테고리>
+    if option == '주간':
+        top5 = leaderboard.top_window(5)
+        title = "🏆 이번 주 추천 맛집 리더보드 (TOP 5)"
+        description = "최근 7일 동안 많이 추천받은 순으로 정렬했어요!"
+    elif option:
+        top5 = leaderboard.top(5, category=option)
+        title = f"🏆 {option} 추천 맛집 리더보드 (TOP 5)"
+        description = "많이 추천받은 순으로 정렬했어요!"
+    else:
+        top5 = leaderboard.top(5)
+        title = "🏆 추천 맛집 리더보드 (TOP 5)"
+        description = "많이 추천받은 순으로 정렬했어요!"
 
     embed = discord.Embed(
-        title="🏆 추천 맛집 리더보드 (TOP 5)",
-        description="많이 추천받은 순으로 정렬했어요!",
+        title=title,
+        description=description,
         color=0xf1c40f
     )
 
-    for i, store in enumerate(top5, start=1):
+    for i, (store_name, count) in enumerate(top5, start=1):
+        store = restaurant_store.get(store_name) or {}
         embed.add_field(
-            name=f"{i}️⃣ {store['store_name']}",
-            value=f"카테고리: {store['category']} | 👍 추천 수: {store['recommand']}",
+            name=f"{i}️⃣ {store_name}",
+            value=f"카테고리: {store.get('category', '')} | 👍 추천 수: {count}",
             inline=False
         )
 
     await ctx.send(embed=embed)
 
+def format_seconds(value):
+    return '-' if value is None else f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
+def stats_lines(name, label):
+    return [
+        f"{row[label]}: {count}회 | p50 {format_seconds(p50)} | p95 {format_seconds(p95)}"
+        for row, count, p50, p95 in metrics.summary(name)
+    ]
+
+@bot.command(name='통계')
+@commands.has_permissions(administrator=True)
+async def show_stats(ctx):
+    """명령어별 처리 시간 p50/p95와 주요 구간 지연 (관리자용)"""
+    embed = discord.Embed(title="📊 봇 통계", description="최근 요청 기준 처리 시간", color=0x3498db)
+    sections = [
+        ("명령어", stats_lines('command_seconds', 'command')),
+        ("크롤링 단계", stats_lines('crawl_phase_seconds', 'phase')),
+        ("OpenAI", stats_lines('openai_request_seconds', 'mode')),
+        ("디스코드 전송", stats_lines('discord_send_seconds', 'kind')),
+        ("추천 락 대기", stats_lines('vote_lock_wait_seconds', 'handler')),
+    ]
+    for title, lines in sections:
+        if lines:
+            embed.add_field(name=title, value='\n'.join(lines)[:1024], inline=False)
+    if not embed.fields:
+        embed.description = "아직 기록된 통계가 없어요."
+    await ctx.send(embed=embed)
+
 # Basic error handler
 @bot.event
 async def on_command_error(ctx, error):
@@ -348,13 +875,21 @@ async def on_command_error(ctx, error):
 
 # clear recommand 만들기 
 def clear_recommand():
-    with open("restaurants.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    for r in data:
-        r["recommand"] = 0
-    with open("restaurants.json", "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    restaurant_store.clear_recommand()
 
 
 if __name__ == "__main__":
-    bot.run(TOKEN)
\ No newline at end of file
+    try:
+        # discord.py가 따로 핸들러를 달지 않도록 (모든 로그는 setup_logging의 큐로)
+        bot.run(TOKEN, log_handler=None)
+    finally:
+        if METRICS_DUMP_PATH:
+            metrics.dump(METRICS_DUMP_PATH)
+        restaurant_store.flush_sync()
+        event_log.flush_sync()
+        db_executor.shutdown(wait=True)
+        db.close()
+        browser_pool.shutdown()
+        close_http_session()
+        image_processor.shutdown()
+        log_listener.stop()
\ No newline at end of file
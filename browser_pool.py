@@ -0,0 +1,146 @@
+"""크롤링용 헤드리스 크롬 브라우저 풀
+
+봇 프로세스가 풀을 하나 들고 있고, 스케줄 크롤링은 여기서 드라이버를 빌려 쓴다.
+브라우저는 처음 필요할 때 띄우고, 빌려줄 때마다 상태를 확인하며,
+일정 횟수 이상 쓰였거나 메모리를 많이 쓰면 새로 띄운다.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+@lru_cache(maxsize=1)
+def get_driver_path():
+    """크롬 드라이버 설치/버전 확인은 프로세스당 한 번만"""
+    return ChromeDriverManager().install()
+
+def create_driver(page_load_timeout=None):
+    """헤드리스 크롬 드라이버 생성"""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--disable-dev-shm-usage')
+    driver = webdriver.Chrome(service=Service(get_driver_path()), options=options)
+    if page_load_timeout:
+        driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        logging.warning(f"드라이버 종료 실패: {e}")
+
+class BrowserPool:
+    def __init__(self, size=3, max_uses=50, max_heap_mb=300, page_load_timeout=None):
+        self.size = size  # 동시에 띄울 수 있는 최대 브라우저 수
+        self.max_uses = max_uses  # 이 횟수만큼 쓰면 재시작
+        self.max_heap_mb = max_heap_mb  # JS 힙이 이보다 커지면 재시작
+        self.page_load_timeout = page_load_timeout
+        self._idle = []  # 쉬고 있는 드라이버
+        self._uses = {}  # 드라이버별 사용 횟수
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def borrow(self, timeout=None):
+        """드라이버를 빌려주고, with 블록이 끝나면 풀로 돌려받음"""
+        driver = self._acquire(timeout)
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self._release(driver, broken)
+
+    def _acquire(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("브라우저 풀이 이미 종료되었습니다.")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    self._created += 1
+                    driver = None
+                    break
+                remaining = deadline - time.monotonic() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("사용 가능한 브라우저가 없습니다.")
+                self._cond.wait(remaining)
+
+        if driver is not None and self._is_healthy(driver):
+            return driver
+        if driver is not None:
+            logging.info("응답 없는 브라우저를 새로 띄웁니다.")
+            self._discard(driver, keep_slot=True)
+        try:
+            driver = create_driver(self.page_load_timeout)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        self._uses[driver] = 0
+        return driver
+
+    def _release(self, driver, broken=False):
+        self._uses[driver] = self._uses.get(driver, 0) + 1
+        recycle = broken or self._closed or self._uses[driver] >= self.max_uses
+        if not recycle:
+            heap_mb = self._heap_mb(driver)
+            if heap_mb is None or heap_mb > self.max_heap_mb:
+                recycle = True
+        if not recycle:
+            try:
+                driver.get('about:blank')  # 이전 페이지 메모리 해제
+            except WebDriverException:
+                recycle = True
+
+        if recycle:
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def _discard(self, driver, keep_slot=False):
+        self._uses.pop(driver, None)
+        quit_driver(driver)
+        if not keep_slot:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _heap_mb(self, driver):
+        try:
+            used = driver.execute_script(
+                "return performance.memory ? performance.memory.usedJSHeapSize : 0")
+            return (used or 0) / (1024 * 1024)
+        except WebDriverException:
+            return None
+
+    def shutdown(self):
+        """쉬고 있는 브라우저를 모두 종료 (빌려간 드라이버는 반납될 때 종료)"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
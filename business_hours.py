@@ -0,0 +1,184 @@
+"""영업시간 파싱과 "지금 영업 중" 인덱스
+
+restaurants.json의 business_hours는 네이버 지도에서 긁어온 자유 텍스트라서
+("평일 11:00 - 20:00 15:00 - 16:30 브레이크타임", "영업시간 수정 제안하기" 등)
+한 번만 요일별 영업 구간(브레이크타임 제외, 휴무일 반영)으로 바꿔 둔다.
+구간은 월요일 0시부터 센 주간 분(0 ~ 10080) 단위로, 구간 경계마다 그때 열려 있는
+음식점 ID 집합을 미리 만들어 두어 조회는 이진 탐색 한 번이면 된다.
+영업시간을 읽지 못한 가게는 항상 열려 있는 것으로 본다.
+
+파서 확인: python business_hours.py (business_hours_corpus.json과 비교)
+"""
+import bisect
+import json
+import re
+from datetime import datetime
+from functools import lru_cache
+import pytz
+
+KST = pytz.timezone('Asia/Seoul')
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+WEEKDAY_NAMES = ['월', '화', '수', '목', '금', '토', '일']
+
+DAY_WORDS = {
+    '평일': (0, 1, 2, 3, 4),
+    '주말': (5, 6),
+    '매일': tuple(range(7)),
+}
+for _i, _name in enumerate(WEEKDAY_NAMES):
+    DAY_WORDS[_name] = DAY_WORDS[_name + '요일'] = (_i,)
+
+TOKEN_RE = re.compile(
+    r'(?P<range>(?P<start>\d{1,2}:\d{2})\s*[-~]\s*(?P<end>\d{1,2}:\d{2}))'
+    r'|(?P<break>브레이크\s*타임)'
+    r'|(?P<closed>휴무|휴일)'
+    r'|(?P<day>평일|주말|매일|[월화수목금토일](?:요일)?)'
+)
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def _tokens(text):
+    for m in TOKEN_RE.finditer(text):
+        if m.group('range'):
+            yield 'range', (_minutes(m.group('start')), _minutes(m.group('end')))
+        elif m.group('break'):
+            yield 'break', None
+        elif m.group('closed'):
+            yield 'closed', None
+        else:
+            # "곱창" 같은 단어 속 글자는 요일로 보지 않음
+            before = text[m.start() - 1:m.start()]
+            after = text[m.end():m.end() + 1]
+            if (before and not before.isspace()) or (after and not after.isspace()):
+                continue
+            yield 'day', DAY_WORDS[m.group('day')]
+
+def _subtract(intervals, cut):
+    result = []
+    for start, end in intervals:
+        if cut[1] <= start or end <= cut[0]:
+            result.append((start, end))
+            continue
+        if start < cut[0]:
+            result.append((start, cut[0]))
+        if cut[1] < end:
+            result.append((cut[1], end))
+    return result
+
+@lru_cache(maxsize=None)
+def parse_business_hours(text):
+    """요일(0=월)별 영업 구간 {요일: ((시작 분, 끝 분), ...)}, 읽을 수 없으면 None
+
+    적혀 있지 않은 요일은 쉬는 날로 본다. 끝이 시작보다 이르면 자정을 넘겨 영업하는 것으로 보고 끝에 24시간을 더한다.
+    """
+    tokens = list(_tokens(text or ''))
+    if not any(kind == 'range' for kind, _ in tokens):
+        return None
+
+    hours = {}
+    days = None  # 지금 읽고 있는 요일들
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        next_kind = tokens[i + 1][0] if i + 1 < len(tokens) else None
+        if kind == 'day':
+            if next_kind == 'closed':
+                # "일요일 휴무", "매주 주말 휴무"
+                for day in value:
+                    hours[day] = []
+                i += 2
+                continue
+            days = value
+        elif kind == 'range':
+            start, end = value
+            if end <= start:
+                end += DAY_MINUTES
+            # "15:00 - 16:30 브레이크타임"과 "브레이크 타임 14:00 - 16:00" 둘 다 있음
+            after_break = i > 0 and tokens[i - 1][0] == 'break'
+            before_break = next_kind == 'break' and (i + 2 >= len(tokens) or tokens[i + 2][0] != 'range')
+            is_break = after_break or before_break
+            target_days = days if days is not None else DAY_WORDS['매일']
+            for day in target_days:
+                if is_break:
+                    hours[day] = _subtract(hours.get(day, []), (start, end))
+                else:
+                    hours.setdefault(day, []).append((start, end))
+            if before_break:
+                i += 1
+        i += 1
+    return {day: tuple(sorted(intervals)) for day, intervals in sorted(hours.items())}
+
+def week_minute(when):
+    """월요일 0시부터 지난 분"""
+    return when.weekday() * DAY_MINUTES + when.hour * 60 + when.minute
+
+class BusinessHoursIndex:
+    def __init__(self, restaurants=()):
+        self.rebuild(restaurants)
+
+    def rebuild(self, restaurants):
+        self.restaurants = list(restaurants)
+        self._ids = {r['store_name']: rid for rid, r in enumerate(self.restaurants)}
+        self.unknown_ids = set()
+        intervals = []  # (시작, 끝, 음식점 ID), 주간 분
+        for rid, r in enumerate(self.restaurants):
+            hours = parse_business_hours(r.get('business_hours'))
+            if hours is None:
+                self.unknown_ids.add(rid)
+                continue
+            for day, day_intervals in hours.items():
+                for start, end in day_intervals:
+                    start += day * DAY_MINUTES
+                    end += day * DAY_MINUTES
+                    # 일요일 밤 -> 월요일 새벽은 주 처음으로 넘김
+                    if end > WEEK_MINUTES:
+                        intervals.append((0, end - WEEK_MINUTES, rid))
+                        end = WEEK_MINUTES
+                    intervals.append((start, end, rid))
+
+        # 경계 b[k] ~ b[k+1] 사이에 열려 있는 ID 집합
+        self._bounds = sorted({0, WEEK_MINUTES} | {t for start, end, _ in intervals for t in (start, end)})
+        self._open = [set(self.unknown_ids) for _ in self._bounds]
+        for start, end, rid in intervals:
+            for k in range(bisect.bisect_left(self._bounds, start), bisect.bisect_left(self._bounds, end)):
+                self._open[k].add(rid)
+        self._open = [frozenset(ids) for ids in self._open]
+
+    def open_ids(self, when=None):
+        """when(기본 지금, KST)에 열려 있는 음식점 ID 집합 (영업시간 모르는 가게 포함)"""
+        when = when or datetime.now(KST)
+        k = bisect.bisect_right(self._bounds, week_minute(when)) - 1
+        return self._open[k]
+
+    def is_open(self, store_name, when=None):
+        rid = self._ids.get(store_name)
+        return rid is None or rid in self.open_ids(when)
+
+    def open_predicate(self, when=None):
+        """음식점 dict가 when에 열려 있는지 보는 함수 (열린 ID 집합은 이때 한 번만 구함, 목록을 만들지 않음)"""
+        ids, index = self.open_ids(when), self._ids
+        return lambda r: r['store_name'] not in index or index[r['store_name']] in ids
+
+def format_hours(hours):
+    """parse_business_hours 결과를 코퍼스 형식 {"월": ["11:00-20:00", ...], ...}으로"""
+    if hours is None:
+        return None
+    return {
+        name: [f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}" for start, end in hours.get(day, ())]
+        for day, name in enumerate(WEEKDAY_NAMES)
+    }
+
+if __name__ == '__main__':
+    with open('business_hours_corpus.json', 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    failed = 0
+    for case in corpus:
+        got = format_hours(parse_business_hours(case['text']))
+        if got != case['expected']:
+            failed += 1
+            print(f"❌ {case['text']!r}\n   expected: {case['expected']}\n   got:      {got}")
+    print(f"{len(corpus) - failed}/{len(corpus)} 통과")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,54 @@
+"""메뉴 채널 목록 (channels.json)
+
+채널마다 카카오 채널 주소, 메뉴를 못 찾았을 때 보여줄 에러 이미지, 끼니별로 카드와 이미지를 고르는 방법을 적는다.
+    "채널 이름": {
+        "url": "https://pf.kakao.com/.../posts",
+        "error_img": "./kakao_error_img/....jpg",          (없어도 됨)
+        "meals": {
+            "lunch": {"slide": 0},                          오늘 카드의 몇 번째 슬라이드인지
+            "dinner": {"slide": 1, "title": "석식|저녁"}     title: 오늘 카드가 여러 개면 제목이 이 정규식에 맞는 것 (없어도 됨)
+        }
+    }
+채널을 추가할 때는 이 파일만 고치면 된다. 경로는 CHANNELS_PATH 환경변수로 바꿀 수 있다.
+"""
+import json
+import os
+import re
+from collections import namedtuple
+
+CHANNELS_PATH = os.getenv('CHANNELS_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'channels.json'))
+MEAL_NAMES = ('lunch', 'dinner')
+
+Channel = namedtuple('Channel', ['key', 'url', 'error_img', 'meals'])  # meals: {끼니: MealRule}
+MealRule = namedtuple('MealRule', ['slide', 'title'])  # title: 컴파일한 정규식 또는 None
+
+def parse_channels(config):
+    """channels.json 내용을 {채널 이름: Channel}로, 잘못된 항목은 ValueError"""
+    channels = {}
+    for key, spec in config.items():
+        if not isinstance(spec, dict) or not spec.get('url'):
+            raise ValueError(f"채널 설정에 url이 없습니다: {key}")
+        meals = {}
+        for meal, rule in spec.get('meals', {}).items():
+            if meal not in MEAL_NAMES:
+                raise ValueError(f"알 수 없는 끼니입니다: {key}.{meal} (가능: {', '.join(MEAL_NAMES)})")
+            slide = rule.get('slide', 0)
+            if not isinstance(slide, int) or slide < 0:
+                raise ValueError(f"slide는 0 이상의 정수여야 합니다: {key}.{meal}")
+            try:
+                title = re.compile(rule['title']) if rule.get('title') else None
+            except re.error as e:
+                raise ValueError(f"title 정규식이 잘못되었습니다: {key}.{meal} ({e})")
+            meals[meal] = MealRule(slide, title)
+        if not meals:
+            raise ValueError(f"채널 설정에 meals가 없습니다: {key}")
+        channels[key] = Channel(key, spec['url'], spec.get('error_img'), meals)
+    return channels
+
+def load_channels(path=CHANNELS_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_channels(json.load(f))
+
+def channel_urls(channels, meal):
+    """끼니 메뉴를 올리는 채널 {채널 이름: url} (설정 파일 순서)"""
+    return {key: channel.url for key, channel in channels.items() if meal in channel.meals}
@@ -0,0 +1,100 @@
+"""채널별 메뉴 크롤링 결과 캐시
+
+(날짜, 끼니, 채널)마다 저장한 이미지 경로를 기억해 두고 파일(kakao_images/.crawl_cache.json)에도 저장한다.
+- 메뉴를 못 찾아 에러 이미지를 대신 넣은 항목은 stale로 표시하고 짧은 간격(stale_ttl)마다 다시 크롤링
+- 제대로 받은 항목도 ttl이 지나면 다시 크롤링
+- 재시작하면 파일에서 오늘 항목만 다시 읽어서 바로 응답
+크롤링은 스레드에서도 하므로 락으로 보호한다.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from atomic_io import write_json_atomic
+
+DEFAULT_PATH = Path('kakao_images') / '.crawl_cache.json'
+FRESH_TTL = 6 * 60 * 60  # 초
+STALE_TTL = 10 * 60  # 에러 이미지로 대신한 항목은 이 시간(초)이 지나면 다시 시도
+
+class CrawlCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=FRESH_TTL, stale_ttl=STALE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._lock = threading.Lock()
+        self._entries = {}  # "날짜|끼니|채널" -> {'path', 'stale', 'updated_at'}
+
+    @staticmethod
+    def _key(date, meal, channel):
+        return f"{date}|{meal}|{channel}"
+
+    def load(self, today):
+        """오늘 항목만 읽기 (파일이 지워진 항목은 버림)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logging.warning(f"크롤링 캐시 파일을 읽지 못했습니다: {e}")
+            return
+        with self._lock:
+            self._entries = {
+                key: entry for key, entry in entries.items()
+                if key.startswith(f"{today}|") and entry.get('path') and os.path.exists(entry['path'])
+            }
+        logging.info(f"크롤링 캐시 불러옴: {len(self._entries)}개")
+
+    def get(self, date, meal, channel):
+        with self._lock:
+            return self._entries.get(self._key(date, meal, channel))
+
+    def put_many(self, date, meal, results):
+        """results: {채널: (이미지 경로 또는 None, stale)} 반영 후 파일에 저장"""
+        now = time.time()
+        with self._lock:
+            for channel, (path, stale) in results.items():
+                key = self._key(date, meal, channel)
+                if path is None:
+                    # 에러 이미지도 없으면 기록하지 않음 (다음 요청 때 다시 시도)
+                    self._entries.pop(key, None)
+                    continue
+                self._entries[key] = {'path': path, 'stale': stale, 'updated_at': now}
+            # 지난 날짜 항목은 버림
+            self._entries = {k: v for k, v in self._entries.items() if k.startswith(f"{date}|")}
+            snapshot = dict(self._entries)
+        try:
+            write_json_atomic(self.path, snapshot)
+        except OSError as e:
+            logging.error(f"크롤링 캐시 저장 실패: {e}")
+
+    def is_fresh(self, entry, now=None):
+        if entry is None:
+            return False
+        age = (now or time.time()) - entry['updated_at']
+        return age < (self.stale_ttl if entry['stale'] else self.ttl)
+
+    def channels_to_refresh(self, date, meal, channels):
+        """항목이 없거나 stale/만료된 채널 목록"""
+        now = time.time()
+        return [channel for channel in channels if not self.is_fresh(self.get(date, meal, channel), now)]
+
+    def missing_channels(self, date, meal, channels):
+        """오늘 메뉴를 아직 못 받은 채널 목록 (항목이 없거나 stale, 시간과 상관없이)"""
+        result = []
+        for channel in channels:
+            entry = self.get(date, meal, channel)
+            if entry is None or entry['stale']:
+                result.append(channel)
+        return result
+
+    def images(self, date, meal, channels):
+        """[(채널, 이미지 경로, stale), ...] 채널 순서대로 (없는 채널은 빠짐)"""
+        result = []
+        for channel in channels:
+            entry = self.get(date, meal, channel)
+            if entry is not None:
+                result.append((channel, entry['path'], entry['stale']))
+        return result
@@ -0,0 +1,94 @@
+"""AI 음식점 설명 캐시
+
+(가게 이름, 프롬프트 버전, 날짜) 단위로 GPT 설명을 저장해두고 재사용한다.
+- 오래된 항목은 ttl이 지나면 버리고, max_entries를 넘으면 가장 오래 안 쓴 것부터 버림
+- 같은 가게 설명을 동시에 요청하면 GPT 호출은 한 번만 하고 결과를 나눠 씀
+- 파일(description_cache.json)에 저장해서 재시작해도 유지 (바뀌면 바로 executor에서, write_behind)
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+import pytz
+from atomic_io import write_json_atomic
+from write_behind import WriteBehind
+
+KST = pytz.timezone('Asia/Seoul')
+DEFAULT_TTL = 24 * 60 * 60  # 초
+DEFAULT_MAX_ENTRIES = 500
+
+class DescriptionCache:
+    def __init__(self, path='description_cache.json', version=1, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.version = version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> {'text', 'created_at'}
+        self._inflight = {}
+        self._writer = WriteBehind(lambda: dict(self._entries), lambda snapshot: write_json_atomic(self.path, snapshot),
+                                   '설명 캐시', 0)
+        self.load()
+
+    def _key(self, store_name):
+        date_bucket = datetime.now(KST).strftime('%Y-%m-%d')
+        return f"{store_name}|v{self.version}|{date_bucket}"
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logging.warning(f"설명 캐시 파일을 읽지 못했습니다: {e}")
+            return
+        now = time.time()
+        for key, entry in entries.items():
+            if now - entry['created_at'] < self.ttl:
+                self._entries[key] = entry
+
+    def get(self, store_name):
+        key = self._key(store_name)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry['created_at'] >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry['text']
+
+    def put(self, store_name, text):
+        key = self._key(store_name)
+        self._entries[key] = {'text': text, 'created_at': time.time()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._writer.schedule()
+
+    async def get_or_create(self, store_name, factory):
+        """캐시에 있으면 바로, 없으면 factory()로 만들어서 저장 (동시 요청은 한 번만 호출)"""
+        cached = self.get(store_name)
+        if cached is not None:
+            return cached
+        key = self._key(store_name)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._create(store_name, factory))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, store_name, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key, store_name, task):
+        """기다리던 요청이 모두 시간 초과로 떠난 뒤에 실패해도 예외를 꺼내서 기록"""
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"설명 생성 실패: {store_name} ({task.exception()!r})")
+
+    async def _create(self, store_name, factory):
+        text = await factory()
+        self.put(store_name, text)
+        return text
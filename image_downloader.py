@@ -0,0 +1,164 @@
+"""메뉴 이미지 비동기 다운로더
+
+aiohttp 세션 하나로 커넥션을 재사용하면서 여러 이미지를 동시에 받는다.
+- 청크 단위로 임시 파일에 쓰고 rename으로 교체 (중간에 끊겨도 기존 파일 유지)
+- ETag/Last-Modified 조건부 요청 + 내용 해시로 같은 이미지는 다시 받거나 쓰지 않음
+- 타임아웃과 재시도 횟수 제한
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+import aiohttp
+from atomic_io import write_json_atomic
+
+META_PATH = Path("./kakao_images/.download_meta.json")
+CHUNK_SIZE = 64 * 1024
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # 초, 재시도마다 두 배
+MAX_CONNECTIONS = 8
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=10)
+
+_meta_lock = threading.Lock()
+
+def file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def load_meta(meta_path=META_PATH):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_meta(meta, meta_path=META_PATH):
+    write_json_atomic(meta_path, meta)
+
+class ImageDownloader:
+    def __init__(self, meta_path=META_PATH, timeout=DOWNLOAD_TIMEOUT, retries=MAX_RETRIES, limit=MAX_CONNECTIONS):
+        self.meta_path = meta_path
+        self.timeout = timeout
+        self.retries = retries
+        self.limit = limit
+        self.meta = {}
+        self.session = None
+
+    async def __aenter__(self):
+        with _meta_lock:
+            self.meta = load_meta(self.meta_path)
+        self.session = aiohttp.ClientSession(
+            timeout=self.timeout,
+            connector=aiohttp.TCPConnector(limit=self.limit),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        with _meta_lock:
+            # 다른 스레드에서 갱신한 항목은 유지하고 이번에 받은 항목만 덮어씀
+            merged = load_meta(self.meta_path)
+            merged.update(self.meta)
+            save_meta(merged, self.meta_path)
+
+    async def download(self, url, filename):
+        """url 이미지를 filename에 저장, 성공하면 True"""
+        filename = Path(filename)
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._download_once(url, filename)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    print(f"이미지 다운로드 실패: {url} ({e})")
+                    return False
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+        return False
+
+    async def download_all(self, jobs):
+        """[(url, filename), ...]을 동시에 받아서 각각의 성공 여부 반환"""
+        return await asyncio.gather(*(self.download(url, filename) for url, filename in jobs))
+
+    async def _download_once(self, url, filename):
+        cached = self.meta.get(url)
+        headers = {}
+        if cached and os.path.exists(cached['path']):
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304:
+                # 서버 이미지가 그대로면 로컬 파일 재사용
+                if Path(cached['path']) != filename:
+                    shutil.copyfile(cached['path'], filename)
+                print(f"이미지 변경 없음: {filename}")
+                self._remember(url, filename, cached['sha256'], response)
+                return True
+            if response.status >= 500:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status)
+            if response.status != 200:
+                print(f"이미지 다운로드 실패: {url} (HTTP {response.status})")
+                return False
+
+            tmp_path = filename.with_name(filename.name + '.part')
+            sha = hashlib.sha256()
+            try:
+                with open(tmp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        sha.update(chunk)
+                        f.write(chunk)
+            except BaseException:
+                if tmp_path.exists():
+                    os.remove(tmp_path)
+                raise
+            digest = sha.hexdigest()
+
+        if filename.exists() and file_sha256(filename) == digest:
+            # 내용이 같으면 기존 파일 유지
+            os.remove(tmp_path)
+            print(f"이미지 변경 없음: {filename}")
+        else:
+            os.replace(tmp_path, filename)
+            print(f"이미지 저장됨: {filename}")
+        self._remember(url, filename, digest, response)
+        return True
+
+    def _remember(self, url, filename, digest, response):
+        previous = self.meta.get(url, {})
+        self.meta[url] = {
+            'path': str(filename),
+            'sha256': digest,
+            'etag': response.headers.get('ETag', previous.get('etag')),
+            'last_modified': response.headers.get('Last-Modified', previous.get('last_modified')),
+        }
+
+def relocate_meta(old_path, new_path, meta_path=META_PATH):
+    """old_path를 가리키던 다운로드 기록을 new_path로 (파일을 옮긴 뒤에도 조건부 요청이 되도록)"""
+    old_path, new_path = str(old_path), str(new_path)
+    with _meta_lock:
+        meta = load_meta(meta_path)
+        changed = False
+        for entry in meta.values():
+            if entry.get('path') == old_path:
+                entry['path'] = new_path
+                changed = True
+        if changed:
+            save_meta(meta, meta_path)
+
+async def download_images_async(jobs):
+    async with ImageDownloader() as downloader:
+        return await downloader.download_all(jobs)
+
+def download_images(jobs):
+    """동기 코드(크롤러 스레드)에서 호출용"""
+    if not jobs:
+        return []
+    return asyncio.run(download_images_async(jobs))
@@ -0,0 +1,88 @@
+"""메뉴 이미지 정규화 (업로드용 파생 이미지)
+
+휴대폰으로 찍은 메뉴판 원본은 몇 MB씩이라 디스코드 업로드가 느리다.
+- 긴 변을 MAX_DIMENSION 이하로 줄이고 progressive JPEG(또는 WebP)로 다시 압축, EXIF 등 메타데이터는 버림
+- 결과는 원본 내용 해시 + 설정으로 이름을 지어 kakao_images/derived에 저장 (같은 이미지는 한 번만 만들고 한 파일만 남음)
+- 변환은 전용 스레드 풀에서 (Pillow는 크기 조절/인코딩 중에 GIL을 놓으므로 이벤트 루프를 막지 않음)
+Pillow가 없으면 원본 경로를 그대로 돌려준다.
+"""
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from image_downloader import file_sha256
+import metrics
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+DERIVED_DIR = Path("./kakao_images/derived")
+MAX_DIMENSION = 1600  # 긴 변 최대 픽셀
+JPEG_QUALITY = 80
+OUTPUT_FORMAT = os.getenv('MENU_IMAGE_FORMAT', 'JPEG').upper()  # JPEG 또는 WEBP
+IMAGE_WORKERS = 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def derived_path(src, out_dir=DERIVED_DIR, max_dim=MAX_DIMENSION, quality=JPEG_QUALITY, fmt=OUTPUT_FORMAT):
+    """원본 내용 해시와 변환 설정으로 정한 파생 이미지 경로"""
+    ext = '.webp' if fmt == 'WEBP' else '.jpg'
+    return Path(out_dir) / f"{file_sha256(src)[:24]}_{max_dim}q{quality}{ext}"
+
+def normalize_image(src, out_dir=DERIVED_DIR, max_dim=MAX_DIMENSION, quality=JPEG_QUALITY, fmt=OUTPUT_FORMAT):
+    """(스레드 풀에서 실행) src의 업로드용 파생 이미지를 만들고 경로 반환, 이미 있으면 그대로 반환"""
+    dest = derived_path(src, out_dir, max_dim, quality, fmt)
+    if dest.exists():
+        return str(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f"{dest.name}.{threading.get_ident()}.tmp")
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)  # 회전 정보는 픽셀에 반영하고 메타데이터는 버림
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+        if fmt == 'WEBP':
+            img.save(tmp_path, 'WEBP', quality=quality, method=4)
+        else:
+            img.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    if os.path.getsize(tmp_path) >= os.path.getsize(src):
+        # 이미 작은 이미지는 다시 압축해도 커질 수 있으니 원본 내용을 그대로 씀
+        shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dest)
+    return str(dest)
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix='image')
+        return _pool
+
+def normalize_images(paths):
+    """{원본 경로: 파생 이미지 경로}, 변환에 실패한 이미지는 원본 경로 그대로"""
+    if Image is None or not paths:
+        return {path: path for path in paths}
+    with metrics.timer('crawl_phase_seconds', phase='normalize'):
+        futures = {path: get_pool().submit(normalize_image, path) for path in paths}
+        result = {}
+        for path, future in futures.items():
+            try:
+                result[path] = future.result()
+            except Exception as e:
+                logging.warning(f"이미지 정규화 실패, 원본 사용: {path} ({e})")
+                result[path] = path
+    saved = sum(os.path.getsize(src) - os.path.getsize(dest) for src, dest in result.items() if src != dest)
+    metrics.inc('image_normalize_saved_bytes_total', saved)
+    return result
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,132 @@
+"""메뉴 이미지 저장소
+
+날마다 채널/끼니별로 받은 이미지를 내용 해시 이름의 blob으로 한 번만 저장한다.
+- kakao_images/blobs/<sha256>.jpg: 같은 이미지는 날짜/끼니가 달라도 파일 하나
+- kakao_images/.image_index.json: "날짜|끼니|채널" -> blob (찾을 때 디렉터리를 훑지 않음)
+- gc(): 보관 기간(retention_days)이 지난 색인 항목을 지우고, 아무 항목도 가리키지 않는 blob과
+  그 blob에서 만든 파생 이미지(kakao_images/derived), 예전 방식의 날짜별 파일을 정리
+크롤링은 여러 스레드에서 하므로 락으로 보호한다.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from image_downloader import file_sha256, relocate_meta
+from atomic_io import write_json_atomic
+
+RETENTION_DAYS = int(os.getenv('IMAGE_RETENTION_DAYS', '14'))
+# 예전에 kakao_images에 바로 쓰던 파일 이름: {채널}_{YYYY_MM_DD}[_dinner].jpg
+LEGACY_NAME_RE = re.compile(r'_(\d{4})_(\d{2})_(\d{2})(?:_dinner)?\.jpg(?:\.part)?$')
+
+class ImageStore:
+    def __init__(self, root='./kakao_images', retention_days=RETENTION_DAYS):
+        self.root = Path(root)
+        self.blob_dir = self.root / 'blobs'
+        self.derived_dir = self.root / 'derived'
+        self.index_path = self.root / '.image_index.json'
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._index = None  # "날짜|끼니|채널" -> {'blob', 'stored_at'}
+
+    @staticmethod
+    def _key(channel, day, meal):
+        return f"{day}|{meal}|{channel}"
+
+    def _load(self):
+        """(락을 잡은 상태에서) 색인을 처음 쓸 때 한 번 읽기"""
+        if self._index is not None:
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            self._index = {}
+        except ValueError as e:
+            logging.warning(f"이미지 색인 파일을 읽지 못했습니다: {e}")
+            self._index = {}
+
+    def _save(self):
+        write_json_atomic(self.index_path, self._index)
+
+    def blob_path(self, blob):
+        return self.blob_dir / blob
+
+    def store(self, channel, day, meal, src):
+        """받은 파일 src를 blob으로 옮기고 색인에 기록, blob 경로 반환 (src는 없어짐)"""
+        src = Path(src)
+        digest = file_sha256(src)
+        blob = f"{digest}{src.suffix or '.jpg'}"
+        dest = self.blob_path(blob)
+        with self._lock:
+            self._load()
+            self.blob_dir.mkdir(parents=True, exist_ok=True)
+            if dest.exists():
+                os.remove(src)
+            else:
+                os.replace(src, dest)
+            self._index[self._key(channel, day, meal)] = {'blob': blob, 'stored_at': time.time()}
+            self._save()
+        # 조건부 요청(ETag)이 계속 되도록 다운로드 기록도 blob을 가리키게
+        relocate_meta(src, dest)
+        return str(dest)
+
+    def lookup(self, channel, day, meal):
+        """(채널, 날짜, 끼니)의 blob 경로, 없으면 None"""
+        with self._lock:
+            self._load()
+            entry = self._index.get(self._key(channel, day, meal))
+        if entry is None:
+            return None
+        path = self.blob_path(entry['blob'])
+        return str(path) if path.exists() else None
+
+    def gc(self, today=None):
+        """보관 기간이 지난 항목과 쓰지 않는 파일 정리, 지운 파일 수 반환"""
+        today = today or date.today()
+        cutoff = (today - timedelta(days=self.retention_days)).isoformat()
+        with self._lock:
+            self._load()
+            expired = [key for key in self._index if key.split('|', 1)[0] < cutoff]
+            for key in expired:
+                del self._index[key]
+            if expired:
+                self._save()
+            live = {entry['blob'] for entry in self._index.values()}
+
+            removed = 0
+            live_hashes = set()
+            if self.blob_dir.exists():
+                for entry in os.scandir(self.blob_dir):
+                    if entry.name in live:
+                        live_hashes.add(entry.name.split('.', 1)[0][:24])
+                    elif entry.is_file():
+                        os.remove(entry.path)
+                        removed += 1
+        # 파생 이미지 이름은 원본 해시 앞 24자로 시작 (image_processor.derived_path)
+        if self.derived_dir.exists():
+            for entry in os.scandir(self.derived_dir):
+                if entry.is_file() and entry.name.split('_', 1)[0] not in live_hashes and self._remove_if_old(entry.path):
+                    removed += 1
+        # 예전 방식 날짜별 파일과 남은 임시 파일
+        for entry in os.scandir(self.root):
+            match = LEGACY_NAME_RE.search(entry.name)
+            if entry.is_file() and match and '-'.join(match.groups()) < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        logging.info(f"이미지 저장소 정리: 색인 {len(expired)}개, 파일 {removed}개 삭제")
+        return removed
+
+    @staticmethod
+    def _remove_if_old(path, min_age=60 * 60):
+        """방금 만든 파일(변환 중인 이미지 등)은 건너뜀, 지웠으면 True"""
+        try:
+            if time.time() - os.path.getmtime(path) >= min_age:
+                os.remove(path)
+                return True
+        except FileNotFoundError:
+            pass
+        return False
@@ -1,241 +1,452 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import os
-from datetime import datetime
+from datetime import date, datetime
 import re
 import json
 from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import shutil
-import pytz 
+import threading
+from collections import namedtuple
+from contextlib import contextmanager, ExitStack
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from image_downloader import download_images
+from image_processor import normalize_images
+from image_store import ImageStore
+from channel_registry import load_channels, channel_urls, MEAL_NAMES
+from browser_pool import create_driver, quit_driver
+from page_wait import wait_for_kakao_cards, PAGE_WAIT_TIMEOUT
+import metrics
 
-def get_today_str_with_weekday():
-    today = datetime.now()
-    weekday_kr = ['월', '화', '수', '목', '금', '토', '일']
-    return f"{today.month}월{today.day}일 {weekday_kr[today.weekday()]}요일"
+try:
+    import lxml  # noqa: F401  (있으면 C 파서로 더 빠르게)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# 카드 제목 날짜: "2025년 05월 26일" / "5월 26일", "5월26일"
+FULL_DATE_RE = re.compile(r'(\d{4})년\s*(\d{1,2})월\s*(\d{1,2})일')
+MONTH_DAY_RE = re.compile(r'(\d{1,2})월\s*(\d{1,2})일')
+STYLE_URL_RE = re.compile(r'url\(["\']?(.*?)["\']?\)')
+# 페이지 전체가 아니라 카드 영역만 트리로 만듦
+# (파싱 중에는 class가 "area_card card_post"처럼 통째로 비교되므로 정규식으로)
+CARD_STRAINER = SoupStrainer('div', class_=re.compile(r'(?:^|\s)area_card(?:\s|$)'))
 
 def get_today_str():
     return datetime.now().strftime('%Y_%m_%d')
 
-def parse_today_cards(cards, key):
+def parse_card_date(title, today=None):
+    """카드 제목에서 날짜 (연도가 없으면 올해), 없으면 None"""
+    today = today or datetime.now()
+    try:
+        match = FULL_DATE_RE.search(title)
+        if match:
+            y, m, d = match.groups()
+            return date(int(y), int(m), int(d))
+        match = MONTH_DAY_RE.search(title)
+        if match:
+            m, d = match.groups()
+            return date(today.year, int(m), int(d))
+    except ValueError:
+        pass
+    return None
+
+def parse_today_cards(cards, key=None):
     """오늘 날짜에 해당하는 카드만 반환"""
-    today = datetime.now()
-    today_cards = []
-    for card in cards:
-        try:
-            title_strong = card.select_one('strong.tit_card')
-            if not title_strong:
-                continue
-            title_text = title_strong.text.strip()
-            is_today = False
-
-            if key == "대륭18차":
-                match = re.search(r'(\d{4})년 (\d{2})월 (\d{2})일', title_text)
-                if match:
-                    y, m, d = match.groups()
-                    card_date = datetime(int(y), int(m), int(d))
-                    if card_date.date() == today.date():
-                        is_today = True
-            else:  # 대륭17차, 에이스하이엔드10차
-                match = re.search(r'(\d{1,2})월(\d{1,2})일', title_text.replace(" ", ""))
-                if match:
-                    m, d = match.groups()
-                    card_date = datetime(today.year, int(m), int(d))
-                    if card_date.date() == today.date():
-                        is_today = True
-            if is_today:
-                today_cards.append(card)
-        except Exception as e:
-            print(f"Error processing card: {e}")
-            continue
-    return today_cards
+    today = datetime.now().date()
+    return [card for card in cards if card.date == today]
 
 def extract_img_url_from_thumb(thumb_div):
     """썸네일 div에서 이미지 URL 추출"""
-    if thumb_div and 'style' in thumb_div.attrs:
-        style = thumb_div['style']
-        match = re.search(r'url\(["\']?(.*?)["\']?\)', style)
+    style = thumb_div.get('style') if thumb_div else None
+    if style:
+        match = STYLE_URL_RE.search(style)
         if match:
             return match.group(1)
     return None
 
 def save_image(img_url, filename):
     """이미지 다운로드 및 저장"""
-    response = requests.get(img_url)
-    if response.status_code == 200:
-        with open(filename, 'wb') as f:
-            f.write(response.content)
-        print(f"이미지 저장됨: {filename}")
-        return True
-    return False
+    return download_images([(img_url, filename)])[0]
 
-def crawl_kakao_images():
-    IMAGES_DIR = Path("./kakao_images")
-    IMAGES_DIR.mkdir(exist_ok=True)
+# 채널 설정 (channels.json: 채널 주소, 에러 이미지, 끼니별로 카드/슬라이드 고르는 방법)
+CHANNELS = load_channels()
+KAKAO_URLS = channel_urls(CHANNELS, 'lunch')
+DINNER_KAKAO_URLS = channel_urls(CHANNELS, 'dinner')
+ERROR_IMG_MAP = {key: channel.error_img for key, channel in CHANNELS.items() if channel.error_img}
 
-    kakao_urls = {
-        "대륭18차": "https://pf.kakao.com/_YgxdPT/posts",
-        "대륭17차": "https://pf.kakao.com/_xfWxfCxj/posts",
-        "에이스하이엔드10차": "https://pf.kakao.com/_rXxkCn/posts"
-    }
+IMAGES_DIR = Path("./kakao_images")
+# 받은 이미지는 내용 해시 blob으로 저장 (날짜별 파일이 쌓이지 않도록)
+image_store = ImageStore(IMAGES_DIR)
 
-    error_img_map = {
-        "대륭18차": './kakao_error_img/대륭18.jpg',
-        "대륭17차": './kakao_error_img/대륭17.jpg',
-        "에이스하이엔드10차": './kakao_error_img/에이스하이엔드10.jpg'
-    }
+# 병렬 크롤링 설정
+MAX_WORKERS = 3  # 동시에 띄울 크롬 드라이버 수
+CHANNEL_TIMEOUT = 30  # 채널 하나당 최대 대기 시간(초), 채널이 시작한 때부터
+PARALLEL_POLL_INTERVAL = 0.5  # 시작한 채널의 시간 초과를 확인하는 간격(초)
 
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+# 브라우저 없이 포스트 API로 먼저 조회 (실패하면 셀레니움으로 렌더링)
+HTTP_FAST_PATH = True
+HTTP_TIMEOUT = (3, 10)  # (연결, 읽기) 초
+KAKAO_POSTS_API = "https://pf.kakao.com/rocket-web/web/profiles/{profile_id}/posts"
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Accept': 'application/json',
+}
+HTTP_POOL_SIZE = MAX_WORKERS  # 채널 스레드들이 같이 쓰는 커넥션 수 (모두 pf.kakao.com)
+_http_session = None
+_http_session_lock = threading.Lock()
 
-    saved_files = []
-    today_file_str = get_today_str()
+# 오늘 조회한 채널별 카드 (한 번 조회한 카드를 점심/저녁 모두에 씀)
+_card_cache = {}  # (채널, 날짜) -> 카드 목록
+_card_cache_lock = threading.Lock()
 
+# 카드 레코드: 제목의 날짜, 제목, 메뉴 이미지 URL 목록 (슬라이드 순서)
+Card = namedtuple('Card', ['date', 'title', 'images'])
+
+def make_card(title, images, today=None):
+    title = (title or '').strip()
+    return Card(parse_card_date(title, today), title, images)
+
+def _is_duplicate_slide(tag):
+    return 'swiper-slide-duplicate' in (tag.get('class') or ())
+
+def parse_html_cards(html):
+    """렌더링된 채널 페이지에서 카드 레코드 추출 (카드 영역만 한 번 훑음)"""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=CARD_STRAINER)
+    today = datetime.now()
+    cards = []
+    for card in soup.find_all('div', class_='area_card'):
+        title_strong = card.find('strong', class_='tit_card')
+        title = title_strong.get_text() if title_strong else ''
+        # 스와이퍼 카드는 복제 슬라이드를 빼고 실제 슬라이드 순서대로
+        slides = [s for s in card.find_all('div', class_='swiper-slide') if not _is_duplicate_slide(s)]
+        if slides:
+            thumbs = [s.find('div', class_='wrap_fit_thumb') for s in slides]
+        else:
+            thumbs = card.find_all('div', class_='wrap_fit_thumb')
+        images = [url for url in (extract_img_url_from_thumb(t) for t in thumbs) if url]
+        cards.append(make_card(title, images, today))
+    return cards
+
+def parse_api_posts(payload):
+    """포스트 API 응답(JSON)에서 카드 레코드 추출"""
+    today = datetime.now()
+    cards = []
+    for post in payload.get('items') or []:
+        images = []
+        for media in post.get('media') or []:
+            url = media.get('xlarge_url') or media.get('large_url') or media.get('url')
+            if url:
+                images.append(url)
+        cards.append(make_card(post.get('title'), images, today))
+    return cards
+
+def get_profile_id(url):
+    """https://pf.kakao.com/_YgxdPT/posts -> _YgxdPT"""
+    match = re.search(r'pf\.kakao\.com/([^/?#]+)', url)
+    return match.group(1) if match else None
+
+def get_http_session():
+    """모든 크롤링 스레드가 같이 쓰는 세션 (채널 스레드는 매번 새로 만들어지므로 커넥션은 세션에 둠)"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            session.headers.update(HTTP_HEADERS)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_session = session
+        return _http_session
+
+def close_http_session():
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+def fetch_cards_http(key, url):
+    """브라우저 없이 포스트 API로 카드 조회, 실패하면 None"""
+    profile_id = get_profile_id(url)
+    if not HTTP_FAST_PATH or not profile_id:
+        return None
     try:
-        for key, url in kakao_urls.items():
-            filename = IMAGES_DIR / f"{key}_{today_file_str}.jpg"
-            if filename.exists():
-                os.remove(filename)
-
-            print(f"크롤링 채널: {key} ({url})")
-            driver.get(url)
-            time.sleep(5)
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            cards = soup.select('div.wrap_webview div.area_card')
-            found_today = False
-
-            # 카드 선택
-            if key == "에이스하이엔드10차":
-                today_str = get_today_str_with_weekday()
-                target_card = None
-                for card in cards:
-                    title_strong = card.select_one('strong.tit_card')
-                    if not title_strong:
-                        continue
-                    title_text = title_strong.text.strip()
-                    if today_str in title_text:
-                        target_card = card
-                        break
-                if target_card:
-                    thumb_divs = target_card.select('div.wrap_fit_thumb')
-                    if thumb_divs:
-                        img_url = extract_img_url_from_thumb(thumb_divs[0])
-                        if img_url and save_image(img_url, filename):
-                            saved_files.append(str(filename))
-                            found_today = True
-            else:
-                today_cards = parse_today_cards(cards, key)
-                target_card = today_cards[0] if today_cards else None
-                if target_card:
-                    thumb_div = target_card.select_one('div.wrap_fit_thumb')
-                    img_url = extract_img_url_from_thumb(thumb_div)
-                    if img_url and save_image(img_url, filename):
-                        saved_files.append(str(filename))
-                        found_today = True
+        with metrics.timer('crawl_phase_seconds', phase='http'):
+            response = get_http_session().get(
+                KAKAO_POSTS_API.format(profile_id=profile_id),
+                headers={'Referer': url},
+                timeout=HTTP_TIMEOUT,
+            )
+            response.raise_for_status()
+            payload = response.json()
+        with metrics.timer('crawl_phase_seconds', phase='parse'):
+            cards = parse_api_posts(payload)
+    except (requests.RequestException, ValueError, AttributeError) as e:
+        print(f"HTTP 조회 실패, 브라우저로 재시도: {key} ({e})")
+        return None
+    # 응답 형식이 달라도 카드는 만들어지므로, 이미지가 있는 오늘 카드가 없으면 브라우저로 확인
+    # (아직 안 올린 날도 브라우저로 한 번 더 보게 되지만 에러 이미지를 잘못 보여주는 것보다 낫다)
+    today_card = find_today_card(cards, key)
+    if today_card is None or not today_card.images:
+        print(f"HTTP 조회 결과에 오늘 메뉴 카드 없음, 브라우저로 재시도: {key}")
+        metrics.inc('crawl_http_fallbacks_total')
+        return None
+    return cards
 
-            # 에러 이미지 처리
-            if not found_today:
-                error_img = error_img_map.get(key)
-                if error_img and os.path.exists(error_img):
-                    if error_img not in saved_files:
-                        saved_files.append(error_img)
-                        print(f"에러 이미지 추가됨: {error_img}")
-                else:
-                    print(f"에러 이미지가 존재하지 않음: {error_img}")
+def fetch_cards_selenium(driver, key, url):
+    """셀레니움으로 채널 페이지를 렌더링해서 카드 조회"""
+    with metrics.timer('crawl_phase_seconds', phase='page_load'):
+        driver.get(url)
+        if not wait_for_kakao_cards(driver):
+            print(f"카드 목록 로딩 시간 초과: {key} ({PAGE_WAIT_TIMEOUT}초)")
+            metrics.inc('crawl_page_wait_timeouts_total')
+        html = driver.page_source
+    with metrics.timer('crawl_phase_seconds', phase='parse'):
+        return parse_html_cards(html)
 
+@contextmanager
+def driver_context(pool=None):
+    """풀이 있으면 빌려 쓰고, 없으면 따로 띄웠다가 종료"""
+    started = time.perf_counter()
+    if pool is not None:
+        with pool.borrow() as driver:
+            metrics.observe('crawl_phase_seconds', time.perf_counter() - started, phase='driver_start')
+            yield driver
+        return
+    driver = create_driver(CHANNEL_TIMEOUT)
+    metrics.observe('crawl_phase_seconds', time.perf_counter() - started, phase='driver_start')
+    try:
+        yield driver
     finally:
-        driver.quit()
-    return saved_files
+        quit_driver(driver)
 
-def crawl_kakao_images_dinner():
-    # 기존 점심 로직과 유사하나 저녁_jpg이라는 파일로 만들어야함 
-    IMAGES_DIR = Path("./kakao_images")
+def find_today_card(cards, key=None, title=None):
+    """오늘 카드 (최신 글이 위에 있으므로 처음 나오는 것), title 정규식이 있으면 제목이 맞는 것"""
+    today = datetime.now().date()
+    for card in cards:
+        if card.date == today and (title is None or title.search(card.title)):
+            return card
+    return None
+
+def find_today_img_url(cards, key, meal='lunch'):
+    """채널 설정(channels.json)대로 오늘 카드에서 끼니 메뉴 이미지 URL"""
+    rule = CHANNELS[key].meals.get(meal)
+    if rule is None:
+        return None
+    target_card = find_today_card(cards, key, rule.title)
+    if not target_card or len(target_card.images) <= rule.slide:
+        return None
+    return target_card.images[rule.slide]
+
+def looks_unposted(cards, key, meal, img_url):
+    """아침에 조회한 카드에는 이 끼니 메뉴가 아직 없는 것 같으면 True
+    (이미지가 없거나, 앞 끼니와 같은 이미지: 저녁 메뉴를 따로 올리는 채널)"""
+    if img_url is None:
+        return True
+    earlier = MEAL_NAMES[:MEAL_NAMES.index(meal)]
+    return any(img_url == find_today_img_url(cards, key, other) for other in earlier if other in CHANNELS[key].meals)
+
+def fetch_cards(key, url, get_driver):
+    """HTTP로 먼저, 실패하면 get_driver()로 받은 브라우저로 카드 조회"""
+    print(f"크롤링 채널: {key} ({url})")
+    cards = fetch_cards_http(key, url)
+    if cards is None:
+        cards = fetch_cards_selenium(get_driver(), key, url)
+    return cards
+
+def get_today_cards(key, url, get_driver, refresh=False):
+    """(카드 목록, 캐시에서 꺼냈는지) 같은 날 조회해서 오늘 카드가 있었으면 다시 조회하지 않음"""
+    cache_key = (key, get_today_str())
+    if not refresh:
+        with _card_cache_lock:
+            cards = _card_cache.get(cache_key)
+        if cards is not None and find_today_card(cards, key):
+            metrics.inc('crawl_card_cache_total', result='hit')
+            return cards, True
+    metrics.inc('crawl_card_cache_total', result='miss')
+    cards = fetch_cards(key, url, get_driver)
+    with _card_cache_lock:
+        # 지난 날짜 카드는 버림
+        for old_key in [k for k in _card_cache if k[1] != cache_key[1]]:
+            del _card_cache[old_key]
+        _card_cache[cache_key] = cards
+    return cards, False
+
+def resolve_img_urls(key, url, meals, get_driver):
+    """채널 하나의 끼니별 오늘 메뉴 이미지 URL {끼니: URL 또는 None}
+    한 번 조회한 카드로 모든 끼니를 찾고, 앞서 조회한 카드는 같은 날 다시 씀"""
+    meals = [meal for meal in meals if meal in CHANNELS[key].meals]
+    cards, cached = get_today_cards(key, url, get_driver)
+    img_urls = {meal: find_today_img_url(cards, key, meal) for meal in meals}
+    if cached and any(looks_unposted(cards, key, meal, img_url) for meal, img_url in img_urls.items()):
+        # 나중에 올라오는 메뉴는 앞서 조회한 카드에 없을 수 있으므로 다시 조회
+        cards, _ = get_today_cards(key, url, get_driver, refresh=True)
+        img_urls = {meal: find_today_img_url(cards, key, meal) for meal in meals}
+    return img_urls
+
+def crawl_channel(key, url, meals, pool=None):
+    """채널 하나를 크롤링해서 {끼니: 오늘 메뉴 이미지 URL} 반환 (HTTP 우선, 실패하면 브라우저)"""
+    with ExitStack() as stack:
+        get_driver = lambda: stack.enter_context(driver_context(pool))
+        return resolve_img_urls(key, url, meals, get_driver)
+
+def crawl_channels_sequential(jobs, meals, pool=None):
+    """채널을 순서대로 크롤링, 브라우저가 필요하면 하나만 띄워서 같이 씀"""
+    results = {}
+    with ExitStack() as stack:
+        driver = None
+
+        def get_driver():
+            nonlocal driver
+            if driver is None:
+                driver = stack.enter_context(driver_context(pool))
+            return driver
+
+        for key, url in jobs:
+            try:
+                results[key] = resolve_img_urls(key, url, meals, get_driver)
+            except Exception as e:
+                print(f"채널 크롤링 실패: {key} ({e})")
+                results[key] = {}
+    return results
+
+def crawl_channels_parallel(jobs, meals, timeout=CHANNEL_TIMEOUT, pool=None):
+    """채널별로 동시에 크롤링 (한 번에 MAX_WORKERS개까지)
+    timeout은 채널마다 실제로 시작한 때부터 재므로, 차례를 기다린 채널도 자기 몫의 시간을 다 쓴다."""
+    results = {}
+    slots = threading.Semaphore(MAX_WORKERS)
+    started = {}  # 채널 -> 작업을 시작한 시각
+    given_up = threading.Event()
+
+    def run(key, url):
+        with slots:
+            if given_up.is_set():
+                return {}
+            started[key] = time.monotonic()
+            return crawl_channel(key, url, meals, pool)
+
+    # 시간을 넘긴 채널이 자리를 계속 잡고 있어도 끝나도록 전체 상한
+    overall_deadline = time.monotonic() + timeout * (-(-len(jobs) // MAX_WORKERS) + 1)
+    executor = ThreadPoolExecutor(max_workers=len(jobs) or 1)
+    try:
+        futures = {executor.submit(run, key, url): key for key, url in jobs}
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            next_check = min(deadlines + [overall_deadline, now + PARALLEL_POLL_INTERVAL])
+            done, pending = wait(pending, timeout=max(0, next_check - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    print(f"채널 크롤링 실패: {key} ({e})")
+                    results[key] = {}
+            now = time.monotonic()
+            expired = {
+                f for f in pending
+                if now >= overall_deadline or (futures[f] in started and now - started[futures[f]] >= timeout)
+            }
+            for future in expired:
+                key = futures[future]
+                print(f"채널 크롤링 시간 초과: {key} ({timeout}초)")
+                metrics.inc('crawl_channel_timeouts_total')
+                results[key] = {}
+            pending -= expired
+    finally:
+        # 느린 채널 때문에 기다리지 않음 (드라이버는 각 스레드에서 정리되고, 차례를 기다리던 채널은 시작하지 않음)
+        given_up.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def crawl_menu_results(kakao_urls, meals=('lunch',), parallel=True, pool=None):
+    """채널을 한 번씩만 조회해서 끼니별 오늘 메뉴 이미지를 저장하고 {끼니: {채널: (이미지 경로, stale)}} 반환
+    끼니마다 그 끼니를 올리는 채널만 들어가고, 실패한 채널은 에러 이미지(stale=True), 에러 이미지도 없으면 경로 None"""
     IMAGES_DIR.mkdir(exist_ok=True)
-    KST = pytz.timezone('Asia/Seoul')
-    kakao_urls = {
-        "대륭17차": "https://pf.kakao.com/_xfWxfCxj/posts",
-        "에이스하이엔드10차": "https://pf.kakao.com/_rXxkCn/posts"
-    }
-    error_img_map = {
-        "대륭18차": './kakao_error_img/대륭18.jpg',
-        "대륭17차": './kakao_error_img/대륭17.jpg',
-        "에이스하이엔드10차": './kakao_error_img/에이스하이엔드10.jpg'
-    }
-    
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--disable-dev-shm-usage')
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-    saved_files = []
     today_file_str = get_today_str()
+    jobs = [(key, url) for key, url in kakao_urls.items() if any(meal in CHANNELS[key].meals for meal in meals)]
+
+    # 1. 채널별 오늘 메뉴 이미지 URL 찾기
+    if parallel:
+        img_urls = crawl_channels_parallel(jobs, meals, pool=pool)
+    else:
+        img_urls = crawl_channels_sequential(jobs, meals, pool=pool)
+
+    # 2. 찾은 이미지를 한 번에 비동기 다운로드
+    downloads = [
+        (meal, key, img_url, IMAGES_DIR / f"{key}_{today_file_str}{'_' + meal if meal != 'lunch' else ''}.jpg")
+        for key, _ in jobs for meal, img_url in img_urls.get(key, {}).items() if img_url
+    ]
     try:
-        for key, url in kakao_urls.items():
-            filename = IMAGES_DIR / f"{key}_{today_file_str}_dinner.jpg"
-            if filename.exists():
-                os.remove(filename)
-
-            print(f"크롤링 채널: {key} ({url})")
-            driver.get(url)
-            time.sleep(5)
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
-            cards = soup.select('div.wrap_webview div.area_card')
-            found_today = False
-
-            # 카드 선택
-            if key == "에이스하이엔드10차":
-                today_str = get_today_str_with_weekday()
-                target_card = None
-                for card in cards:
-                    title_strong = card.select_one('strong.tit_card')
-                    if not title_strong:
-                        continue
-                    title_text = title_strong.text.strip()
-                    if today_str in title_text:
-                        target_card = card
-                        break
-                if target_card:
-                    next_slide = target_card.select('div.swiper-slide-next')[0]
-                    if next_slide:
-                        thumb_divs = next_slide.select('div.wrap_fit_thumb')
-                        img_url = extract_img_url_from_thumb(thumb_divs[0])
-                        if img_url and save_image(img_url, filename):
-                            saved_files.append(str(filename))
-                            found_today = True
-            else:
-                today_cards = parse_today_cards(cards, key)
-                target_card = today_cards[0] if today_cards else None
-                if target_card:
-                    thumb_div = target_card.select_one('div.wrap_fit_thumb')
-                    print(thumb_div)
-                    img_url = extract_img_url_from_thumb(thumb_div)
-                    if img_url and save_image(img_url, filename):
-                        saved_files.append(str(filename))
-                        found_today = True
+        with metrics.timer('crawl_phase_seconds', phase='download'):
+            ok = download_images([(img_url, filename) for _, _, img_url, filename in downloads])
+    except Exception as e:
+        print(f"이미지 다운로드 실패: {e}")
+        ok = [False] * len(downloads)
+    day = datetime.now().strftime('%Y-%m-%d')
+    saved = {}  # (끼니, 채널) -> 경로
+    for (meal, key, _, filename), success in zip(downloads, ok):
+        if not success:
+            continue
+        try:
+            saved[meal, key] = image_store.store(key, day, meal, filename)
+        except OSError as e:
+            print(f"이미지 저장소 기록 실패, 받은 파일 그대로 사용: {filename} ({e})")
+            saved[meal, key] = str(filename)
+    # 3. 업로드용으로 줄이고 다시 압축한 이미지로 교체
+    derived = normalize_images(list(dict.fromkeys(saved.values())))
+    saved = {target: derived[path] for target, path in saved.items()}
+
+    results = {}
+    for meal in meals:
+        results[meal] = {}
+        for key, _ in jobs:
+            if meal not in CHANNELS[key].meals:
+                continue
+            if (meal, key) in saved:
+                results[meal][key] = (saved[meal, key], False)
+                metrics.inc('crawl_channels_total', result='ok')
+                continue
+            metrics.inc('crawl_channels_total', result='failed')
 
             # 에러 이미지 처리
-            if not found_today:
-                error_img = error_img_map.get(key)
-                if error_img and os.path.exists(error_img):
-                    if error_img not in saved_files:
-                        saved_files.append(error_img)
-                        print(f"에러 이미지 추가됨: {error_img}")
-                else:
-                    print(f"에러 이미지가 존재하지 않음: {error_img}")
+            error_img = ERROR_IMG_MAP.get(key)
+            if error_img and os.path.exists(error_img):
+                results[meal][key] = (error_img, True)
+                print(f"에러 이미지 추가됨: {error_img}")
+            else:
+                results[meal][key] = (None, True)
+                print(f"에러 이미지가 존재하지 않음: {error_img}")
+    return results
 
-    finally:
-        driver.quit()
-    return saved_files
+def stored_menu_results(channels, meal):
+    """오늘 이미 받아서 저장소에 있는 끼니 메뉴 {채널: (이미지 경로, False)} (크롤링 캐시를 잃었을 때 다시 받지 않도록)
+    저장소 색인에서 바로 찾으므로 디렉터리를 훑지 않는다."""
+    day = datetime.now().strftime('%Y-%m-%d')
+    found = {key: image_store.lookup(key, day, meal) for key in channels}
+    found = {key: path for key, path in found.items() if path}
+    derived = normalize_images(list(dict.fromkeys(found.values())))
+    return {key: (derived[path], False) for key, path in found.items()}
+
+def crawl_menu_images(kakao_urls, meal='lunch', parallel=True, pool=None):
+    """채널별 오늘 메뉴 이미지 경로 목록 (실패한 채널은 에러 이미지로 대체)"""
+    results = crawl_menu_results(kakao_urls, (meal,), parallel, pool)[meal]
+    return list(dict.fromkeys(path for path, _ in results.values() if path))
+
+@metrics.timed('crawl_seconds', meal='lunch')
+def crawl_kakao_images(parallel=True, pool=None):
+    return crawl_menu_images(KAKAO_URLS, 'lunch', parallel=parallel, pool=pool)
+
+@metrics.timed('crawl_seconds', meal='dinner')
+def crawl_kakao_images_dinner(parallel=True, pool=None):
+    return crawl_menu_images(DINNER_KAKAO_URLS, 'dinner', parallel=parallel, pool=pool)
 
-    
-    
 if __name__ == "__main__":
-    result = crawl_kakao_images_dinner()
-    print("Saved files:", result)
\ No newline at end of file
+    # 등록된 채널 전부를 한 번씩만 조회해서 점심/저녁 메뉴를 같이 받음
+    all_urls = {key: channel.url for key, channel in CHANNELS.items()}
+    for meal, result in crawl_menu_results(all_urls, MEAL_NAMES).items():
+        print(f"{meal}:", result)
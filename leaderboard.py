@@ -0,0 +1,114 @@
+"""추천 리더보드
+
+추천 수가 바뀔 때마다 정렬된 목록을 조금씩 갱신해서, 조회할 때는 앞에서 k개만 읽는다.
+- 전체 / 카테고리별 (category "일식,돈가스"는 "일식", "돈가스" 둘 다에 들어감)
+- 최근 window 기간(기본 7일) 동안 받은 추천 수 기준
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from sortedcontainers import SortedList
+
+def split_category(category):
+    return [c.strip() for c in (category or '').split(',') if c.strip()]
+
+class _Board:
+    """(추천 수 내림차순, 등록 순서) 정렬 목록"""
+    def __init__(self):
+        self._items = SortedList()
+        self._keys = {}
+
+    def set(self, store_name, count, order):
+        old = self._keys.get(store_name)
+        if old is not None:
+            self._items.remove(old)
+        key = (-count, order, store_name)
+        self._items.add(key)
+        self._keys[store_name] = key
+
+    def discard(self, store_name):
+        old = self._keys.pop(store_name, None)
+        if old is not None:
+            self._items.remove(old)
+
+    def top(self, n):
+        return [(name, -neg_count) for neg_count, _, name in self._items[:n]]
+
+class Leaderboard:
+    def __init__(self, window=timedelta(days=7)):
+        self.window = window
+        self._order = {}
+        self._categories = {}
+        self._all = _Board()
+        self._by_category = defaultdict(_Board)
+        # 기간 리더보드: 살아있는 추천 (시각, message_id, user_id, 가게)
+        self._votes = SortedList()
+        self._window_counts = defaultdict(int)
+        self._window = _Board()
+
+    # 전체 / 카테고리별
+    def rebuild(self, restaurants):
+        self._order = {}
+        self._categories = {}
+        self._all = _Board()
+        self._by_category = defaultdict(_Board)
+        for r in restaurants:
+            self.update(r)
+
+    def update(self, restaurant):
+        """가게 하나의 추천 수 반영 (RestaurantStore 리스너), O(log n)"""
+        name = restaurant['store_name']
+        order = self._order.setdefault(name, len(self._order))
+        count = restaurant.get('recommand', 0)
+        categories = split_category(restaurant.get('category'))
+        for category in self._categories.get(name, []):
+            if category not in categories:
+                self._by_category[category].discard(name)
+        self._categories[name] = categories
+        self._all.set(name, count, order)
+        for category in categories:
+            self._by_category[category].set(name, count, order)
+
+    def top(self, n=5, category=None):
+        """[(가게 이름, 추천 수), ...]"""
+        if category:
+            board = self._by_category.get(category)
+            return board.top(n) if board else []
+        return self._all.top(n)
+
+    # 기간(최근 window) 리더보드
+    def load_votes(self, votes):
+        """[(message_id, user_id, store_name, created_at ISO 문자열), ...]"""
+        for message_id, user_id, store_name, created_at in votes:
+            self.add_vote(message_id, user_id, store_name, datetime.fromisoformat(created_at))
+
+    def add_vote(self, message_id, user_id, store_name, created_at):
+        if created_at < datetime.now() - self.window:
+            return
+        self._votes.add((created_at, message_id, user_id, store_name))
+        self._change_window_count(store_name, 1)
+
+    def remove_vote(self, message_id, user_id, store_name, created_at):
+        key = (created_at, message_id, user_id, store_name)
+        if key in self._votes:
+            self._votes.remove(key)
+            self._change_window_count(store_name, -1)
+
+    def _change_window_count(self, store_name, delta):
+        count = self._window_counts[store_name] + delta
+        if count > 0:
+            self._window_counts[store_name] = count
+            self._window.set(store_name, count, self._order.get(store_name, len(self._order)))
+        else:
+            self._window_counts.pop(store_name, None)
+            self._window.discard(store_name)
+
+    def _expire(self):
+        cutoff = datetime.now() - self.window
+        while self._votes and self._votes[0][0] < cutoff:
+            _, _, _, store_name = self._votes.pop(0)
+            self._change_window_count(store_name, -1)
+
+    def top_window(self, n=5):
+        """최근 window 동안 받은 추천 수 기준 [(가게 이름, 추천 수), ...]"""
+        self._expire()
+        return self._window.top(n)
@@ -0,0 +1,116 @@
+"""로그 파이프라인
+
+이벤트 루프에서 디스크에 쓰지 않도록
+- 일반 로그: QueueHandler로 큐에 넣기만 하고, QueueListener 스레드가 bot.log에 씀
+  (크기가 넘으면 gzip으로 압축해서 돌림)
+- 추천 이벤트: EventLogWriter가 모아두었다가 executor에서 JSONL에 한 번에 덧붙임 (write_behind)
+  (크기나 날짜가 넘으면 gzip으로 압축해서 돌림, 같은 묶음을 DB에도 넣을 수 있음)
+"""
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+from datetime import datetime
+from pathlib import Path
+from write_behind import WriteBehind
+
+LOG_FORMAT = '%(asctime)s %(levelname)s:%(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+# 스케줄러/HTTP 라이브러리의 INFO 로그는 너무 많아서 WARNING부터만 남김
+NOISY_LOGGERS = ['apscheduler', 'httpx', 'httpcore', 'openai', 'urllib3', 'WDM', 'discord.http', 'discord.gateway']
+
+EVENT_FLUSH_INTERVAL = 2.0  # 이벤트가 들어오고 이 시간(초) 안에는 저장
+EVENT_BATCH_SIZE = 50  # 이만큼 모이면 바로 저장
+EVENT_MAX_BYTES = 5 * 1024 * 1024
+EVENT_BACKUP_COUNT = 10
+
+def gzip_rotator(source, dest):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+def setup_logging(path='bot.log', level=logging.INFO, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """루트 로거를 큐 기반으로 설정하고 QueueListener를 돌려줌 (종료할 때 stop())"""
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.namer = lambda name: name + '.gz'
+    file_handler.rotator = gzip_rotator
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+class EventLogWriter:
+    def __init__(self, path, on_batch=None, flush_interval=EVENT_FLUSH_INTERVAL, batch_size=EVENT_BATCH_SIZE,
+                 max_bytes=EVENT_MAX_BYTES, backup_count=EVENT_BACKUP_COUNT):
+        self.path = Path(path)
+        self.on_batch = on_batch  # 저장할 묶음(dict 목록)을 받는 콜백, executor에서 호출 (DB 등)
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._pending = []
+        # 첫 이벤트 후 flush_interval 안에 저장 (이벤트가 더 들어와도 미루지 않음)
+        self._writer = WriteBehind(self._take, self._write, '이벤트 로그', flush_interval, restore=self._restore)
+
+    def log(self, entry):
+        """이벤트 하나 추가 (바로 반환)"""
+        self._pending.append(entry)
+        self._writer.schedule(immediate=len(self._pending) >= self.batch_size)
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _restore(self, batch):
+        self._pending[:0] = batch
+        self._writer.schedule()
+
+    async def flush(self):
+        await self._writer.flush()
+
+    def flush_sync(self):
+        self._writer.flush_sync()
+
+    def _write(self, batch):
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in batch).encode('utf-8')
+        self._rotate_if_needed(len(data))
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        if self.on_batch is not None:
+            # 파일에는 이미 썼으므로 여기서 실패해도 다시 쓰지 않음
+            try:
+                self.on_batch(batch)
+            except Exception as e:
+                logging.error(f"이벤트 묶음 처리 실패: {e}")
+
+    def _rotate_if_needed(self, incoming):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_size == 0:
+            return
+        # 크기가 넘거나, 마지막으로 쓴 날짜가 오늘이 아니면 돌림
+        last_written = datetime.fromtimestamp(stat.st_mtime)
+        if stat.st_size + incoming <= self.max_bytes and last_written.date() == datetime.now().date():
+            return
+        dest = self.path.with_name(f"{self.path.stem}.{last_written:%Y%m%d-%H%M%S}{self.path.suffix}.gz")
+        gzip_rotator(self.path, dest)
+        backups = sorted(self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}.gz"))
+        for old in backups[:-self.backup_count] if self.backup_count else []:
+            old.unlink()
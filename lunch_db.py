@@ -0,0 +1,229 @@
+"""SQLite 저장소 (WAL 모드)
+
+음식점, 사용자별 추천(👍) 기록, 추천 이력을 테이블로 관리한다.
+처음 실행할 때 기존 restaurants.json / recommend_log.jsonl을 한 번 가져온다.
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS restaurants (
+    id INTEGER PRIMARY KEY,
+    store_name TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL DEFAULT '',
+    rating REAL NOT NULL DEFAULT 0,
+    visited_review INTEGER NOT NULL DEFAULT 0,
+    blog_review INTEGER NOT NULL DEFAULT 0,
+    address TEXT NOT NULL DEFAULT '',
+    tell_num TEXT,
+    business_hours TEXT NOT NULL DEFAULT '',
+    recommand INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_restaurants_category ON restaurants(category);
+CREATE INDEX IF NOT EXISTS idx_restaurants_recommand ON restaurants(recommand DESC);
+
+CREATE TABLE IF NOT EXISTS votes (
+    message_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    store_name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (message_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_votes_store_name ON votes(store_name);
+CREATE INDEX IF NOT EXISTS idx_votes_created_at ON votes(created_at);
+
+CREATE TABLE IF NOT EXISTS recommend_messages (
+    message_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    store_name TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recommend_messages_created_at ON recommend_messages(created_at);
+
+CREATE TABLE IF NOT EXISTS recommend_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER,
+    username TEXT,
+    store_name TEXT NOT NULL,
+    category TEXT,
+    timestamp TEXT NOT NULL,
+    channel_id INTEGER,
+    guild_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_recommend_events_store_name ON recommend_events(store_name);
+CREATE INDEX IF NOT EXISTS idx_recommend_events_user_time ON recommend_events(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_recommend_events_time ON recommend_events(timestamp);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+RESTAURANT_COLUMNS = ['store_name', 'category', 'rating', 'visited_review', 'blog_review',
+                      'address', 'tell_num', 'business_hours', 'recommand']
+
+class LunchDB:
+    # RestaurantStore 백엔드로 쓸 때 바뀐 가게만 저장
+    incremental = True
+
+    def __init__(self, path='lunch_bot.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def _migrate(self):
+        """예전 스키마로 만든 DB에 빠진 컬럼 추가"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(recommend_events)")}
+        if columns:
+            for column in ('channel_id', 'guild_id'):
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE recommend_events ADD COLUMN {column} INTEGER")
+
+    def _execute(self, sql, params=()):
+        with self._lock, self.conn:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _executemany(self, sql, rows):
+        with self._lock, self.conn:
+            self.conn.executemany(sql, rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # 기존 파일 가져오기
+    def import_legacy(self, restaurants_path='restaurants.json', log_path='recommend_log.jsonl'):
+        """기존 JSON/JSONL 데이터를 한 번만 가져옴, 가져왔으면 True"""
+        if self._execute("SELECT value FROM meta WHERE key = 'legacy_imported'"):
+            return False
+        with open(restaurants_path, 'r', encoding='utf-8') as f:
+            restaurants = json.load(f)
+        events = []
+        try:
+            with open(log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        logging.warning(f"추천 로그 파싱 실패: {line}")
+        except FileNotFoundError:
+            pass
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO restaurants ({', '.join(RESTAURANT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(RESTAURANT_COLUMNS))})",
+                [self._restaurant_row(r) for r in restaurants],
+            )
+            self.conn.executemany(
+                "INSERT INTO recommend_events (user_id, username, store_name, category, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [(e.get('user_id'), e.get('username'), e['store_name'], e.get('category'), e['timestamp']) for e in events],
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (datetime.now().isoformat(),))
+        logging.info(f"기존 데이터 가져오기 완료: 음식점 {len(restaurants)}개, 추천 로그 {len(events)}건")
+        return True
+
+    def _restaurant_row(self, r):
+        return (
+            r['store_name'], r.get('category', ''), r.get('rating', 0), r.get('visited_review', 0),
+            r.get('blog_review', 0), r.get('address', ''), r.get('tell_num', r.get('phone_num')),
+            r.get('business_hours', ''), r.get('recommand', 0),
+        )
+
+    # 음식점
+    def load(self):
+        """RestaurantStore에서 쓰는 dict 목록 (restaurants.json과 같은 모양)"""
+        rows = self._execute(f"SELECT {', '.join(RESTAURANT_COLUMNS)} FROM restaurants ORDER BY id")
+        restaurants = []
+        for row in rows:
+            r = dict(row)
+            if r['tell_num'] is None:
+                del r['tell_num']
+            restaurants.append(r)
+        return restaurants
+
+    def save(self, restaurants):
+        """바뀐 가게의 추천 수만 갱신"""
+        self._executemany(
+            "UPDATE restaurants SET recommand = ? WHERE store_name = ?",
+            [(r.get('recommand', 0), r['store_name']) for r in restaurants],
+        )
+
+    # 사용자별 추천
+    def add_vote(self, message_id, user_id, store_name):
+        """새로 추가된 추천이면 추천 시각(datetime), 이미 있으면 None"""
+        created_at = datetime.now()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO votes (message_id, user_id, store_name, created_at) VALUES (?, ?, ?, ?)",
+                (message_id, user_id, store_name, created_at.isoformat()),
+            )
+            return created_at if cursor.rowcount > 0 else None
+
+    def remove_vote(self, message_id, user_id):
+        """지워진 추천의 (가게 이름, 추천 시각), 없었으면 None"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT store_name, created_at FROM votes WHERE message_id = ? AND user_id = ?",
+                (message_id, user_id)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("DELETE FROM votes WHERE message_id = ? AND user_id = ?", (message_id, user_id))
+            return row['store_name'], datetime.fromisoformat(row['created_at'])
+
+    def votes_since(self, since):
+        """since(ISO 문자열) 이후의 추천 [(message_id, user_id, store_name, created_at), ...]"""
+        rows = self._execute(
+            "SELECT message_id, user_id, store_name, created_at FROM votes WHERE created_at >= ?", (since,))
+        return [tuple(row) for row in rows]
+
+    def message_votes(self, message_id):
+        """메시지에 기록된 추천 {user_id: 추천 시각}"""
+        rows = self._execute("SELECT user_id, created_at FROM votes WHERE message_id = ?", (message_id,))
+        return {row['user_id']: datetime.fromisoformat(row['created_at']) for row in rows}
+
+    # 추천 메시지 (메시지 캐시에 없어도 반응 이벤트만으로 가게를 찾기 위함)
+    def register_message(self, message_id, channel_id, store_name):
+        self._execute(
+            "INSERT OR REPLACE INTO recommend_messages (message_id, channel_id, store_name, created_at) VALUES (?, ?, ?, ?)",
+            (message_id, channel_id, store_name, datetime.now().isoformat()),
+        )
+
+    def get_message_store(self, message_id):
+        rows = self._execute("SELECT store_name FROM recommend_messages WHERE message_id = ?", (message_id,))
+        return rows[0][0] if rows else None
+
+    def recent_messages(self, since):
+        """since(ISO 문자열) 이후 보낸 추천 메시지 [(message_id, channel_id, store_name), ...]"""
+        rows = self._execute(
+            "SELECT message_id, channel_id, store_name FROM recommend_messages WHERE created_at >= ?", (since,))
+        return [tuple(row) for row in rows]
+
+    # 추천 이력
+    def log_recommendations(self, entries):
+        self._executemany(
+            "INSERT INTO recommend_events (user_id, username, store_name, category, timestamp, channel_id, guild_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(e.get('user_id'), e.get('username'), e['store_name'], e.get('category'), e['timestamp'],
+              e.get('channel_id'), e.get('guild_id')) for e in entries],
+        )
+
+    def recommendation_history(self, since):
+        """since(ISO 문자열) 이후 추천 [(store_name, user_id, channel_id, timestamp), ...] 오래된 것부터"""
+        rows = self._execute(
+            "SELECT store_name, user_id, channel_id, timestamp FROM recommend_events WHERE timestamp >= ? ORDER BY timestamp",
+            (since,))
+        return [tuple(row) for row in rows]
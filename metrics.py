@@ -0,0 +1,172 @@
+"""가벼운 메트릭 (카운터, 히스토그램, 타이머)
+
+크롤링 단계, OpenAI 호출, 디스코드 전송, 락 대기, 명령어 처리 시간을 모은다.
+크롤링은 스레드에서 돌기 때문에 기록은 락으로 보호한다.
+- Prometheus 텍스트 형식으로 내보내기 (render, start_http_server, dump)
+- 히스토그램마다 최근 RESERVOIR_SIZE개 값을 따로 들고 있어서 p50/p95를 바로 계산 (!통계)
+"""
+import asyncio
+import functools
+import inspect
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from atomic_io import write_text_atomic
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RESERVOIR_SIZE = 1024  # 백분위 계산에 쓰는 최근 값 개수
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+def percentile(sorted_values, q):
+    """정렬된 값에서 q(0~1) 백분위 (가장 가까운 순위)"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def percentiles(self, *qs):
+        values = sorted(self.recent)
+        return [percentile(values, q) for q in qs]
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (이름, 라벨) -> 값
+        self._histograms = {}  # (이름, 라벨) -> Histogram
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with 블록 실행 시간(초)을 히스토그램에 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """함수(동기/비동기) 실행 시간을 기록하는 데코레이터"""
+        def decorator(func):
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self, name):
+        """히스토그램 name의 라벨별 [(라벨 dict, 횟수, p50, p95), ...] 횟수 많은 순"""
+        with self._lock:
+            rows = [
+                (dict(label_key), histogram.count, *histogram.percentiles(0.5, 0.95))
+                for (hist_name, label_key), histogram in self._histograms.items() if hist_name == name
+            ]
+        return sorted(rows, key=lambda row: -row[1])
+
+    def counter_value(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            lines = []
+            last_name = None
+            for (name, label_key), value in counters:
+                if name != last_name:
+                    lines.append(f"# TYPE {name} counter")
+                    last_name = name
+                lines.append(f"{name}{_format_labels(label_key)} {value}")
+            last_name = None
+            for (name, label_key), histogram in histograms:
+                if name != last_name:
+                    lines.append(f"# TYPE {name} histogram")
+                    last_name = name
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(label_key, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(label_key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{name}_sum{_format_labels(label_key)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(label_key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path):
+        """파일로 내보내기 (node_exporter textfile 수집기 등)"""
+        write_text_atomic(path, self.render())
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
+timed = registry.timed
+summary = registry.summary
+render = registry.render
+dump = registry.dump
+
+async def start_http_server(port, host='0.0.0.0', registry=registry):
+    """/metrics 엔드포인트를 띄우고 runner를 돌려줌 (종료할 때 runner.cleanup())"""
+    from aiohttp import web
+
+    async def handle(request):
+        text = await asyncio.get_running_loop().run_in_executor(None, registry.render)
+        return web.Response(text=text, content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
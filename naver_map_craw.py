@@ -3,10 +3,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
 import re
 import csv
-import selenium.common.exceptions
+from page_wait import wait_for_css, wait_for_frame, wait_for_count_increase, wait_for_staleness, NAVER_RESULT_SELECTOR
 
 # 크롬 드라이버 실행 (환경변수 등록 시 경로 생략 가능)
 driver = webdriver.Chrome()
@@ -20,22 +19,17 @@ search_box.send_keys("독산역 맛집")
 search_box.send_keys(Keys.ENTER)
 
 # 2. 검색 결과 iframe 대기 및 전환
-iframe = None
-for _ in range(40):  # 최대 40초 동안 반복 체크
-    try:
-        iframe = driver.find_element(By.CSS_SELECTOR, "iframe#searchIframe")
-        break
-    except selenium.common.exceptions.NoSuchElementException:
-        time.sleep(1)
-if iframe is None:
+if not wait_for_frame(driver, "iframe#searchIframe", timeout=40):  # 최대 40초 대기
     raise Exception("iframe#searchIframe을 찾지 못했습니다.")
-driver.switch_to.frame(iframe)
 
 # 3. 스크롤 내리기
 scroll_div = wait.until(EC.presence_of_element_located((By.XPATH, "/html/body/div[3]/div/div[2]/div[1]")))
 for _ in range(5):
+    loaded = len(driver.find_elements(By.CSS_SELECTOR, NAVER_RESULT_SELECTOR))
     driver.execute_script("arguments[0].scrollBy(0,2000);", scroll_div)
-    time.sleep(1)
+    # 추가 결과가 로딩되면 바로 다음 스크롤, 더 없으면 짧게 기다리고 종료
+    if not wait_for_count_increase(driver, NAVER_RESULT_SELECTOR, loaded, timeout=3):
+        break
 
 # 4. CSV 파일 준비
 file = open('stores.csv', mode='w', newline='', encoding='utf-8')
@@ -45,7 +39,7 @@ final_result = []
 
 # 5. 페이지 반복
 for i in range(2, 6):  # 2~5페이지
-    stores = driver.find_elements(By.CSS_SELECTOR, "li.VLTHu.OW9LQ")  # 최신 클래스명 확인 필요
+    stores = driver.find_elements(By.CSS_SELECTOR, NAVER_RESULT_SELECTOR)  # 최신 클래스명 확인 필요
     for store in stores:
         try:
             name = store.find_element(By.CSS_SELECTOR, "span.YwYLL").text
@@ -83,7 +77,10 @@ for i in range(2, 6):  # 2~5페이지
     try:
         next_button = driver.find_element(By.LINK_TEXT, str(i))
         next_button.click()
-        time.sleep(3)
+        # 이전 페이지 목록이 사라지고 새 목록이 뜰 때까지 대기
+        if stores:
+            wait_for_staleness(driver, stores[0])
+        wait_for_css(driver, NAVER_RESULT_SELECTOR)
     except Exception as e:
         print(f"페이지 {i} 이동 실패: {e}")
         break
@@ -0,0 +1,46 @@
+"""셀레니움 페이지 로딩 대기 유틸
+
+고정된 time.sleep 대신 필요한 요소가 실제로 나타나는 즉시 반환한다.
+최대 대기 시간은 PAGE_WAIT_TIMEOUT 환경변수로 조정할 수 있다.
+"""
+import os
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+PAGE_WAIT_TIMEOUT = float(os.getenv('PAGE_WAIT_TIMEOUT', '10'))  # 최대 대기 시간(초)
+POLL_INTERVAL = 0.2
+
+KAKAO_CARD_SELECTOR = 'div.wrap_webview div.area_card'
+NAVER_RESULT_SELECTOR = 'li.VLTHu.OW9LQ'
+
+def _wait(driver, condition, timeout=None):
+    """condition이 만족되면 결과를, 시간 초과면 None 반환"""
+    try:
+        return WebDriverWait(driver, timeout or PAGE_WAIT_TIMEOUT, poll_frequency=POLL_INTERVAL).until(condition)
+    except TimeoutException:
+        return None
+
+def wait_for_css(driver, selector, timeout=None):
+    """selector에 해당하는 요소가 나타날 때까지 대기, 나타나면 True"""
+    return _wait(driver, EC.presence_of_element_located((By.CSS_SELECTOR, selector)), timeout) is not None
+
+def wait_for_kakao_cards(driver, timeout=None):
+    """카카오 채널 포스트 카드 목록이 렌더링될 때까지 대기"""
+    return wait_for_css(driver, KAKAO_CARD_SELECTOR, timeout)
+
+def wait_for_frame(driver, selector, timeout=None):
+    """iframe이 준비되면 해당 프레임으로 전환, 성공하면 True"""
+    return _wait(driver, EC.frame_to_be_available_and_switch_to_it((By.CSS_SELECTOR, selector)), timeout) is not None
+
+def wait_for_count_increase(driver, selector, previous_count, timeout=None):
+    """selector 요소 개수가 previous_count보다 늘어날 때까지 대기 (스크롤 추가 로딩용)"""
+    def more_loaded(d):
+        count = len(d.find_elements(By.CSS_SELECTOR, selector))
+        return count if count > previous_count else False
+    return _wait(driver, more_loaded, timeout)
+
+def wait_for_staleness(driver, element, timeout=None):
+    """element가 DOM에서 사라질 때까지 대기 (페이지 이동 확인용)"""
+    return _wait(driver, EC.staleness_of(element), timeout) is not None
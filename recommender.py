@@ -0,0 +1,162 @@
+"""가중치 기반 음식점 추천
+
+평점, 방문자/블로그 리뷰 수, 👍 추천 수로 가게마다 가중치를 매기고
+펜윅 트리(누적합 트리)에 넣어 O(log n)으로 뽑는다. 추천 수가 바뀌면 그 가게만 갱신한다.
+- 난수는 (날짜, 서버)마다 따로 시드를 정해서 같은 날 같은 서버는 같은 흐름을 따름
+- 최근 suppress_window 동안 그 사용자나 채널에 추천된 가게는 되도록 빼고 뽑음
+"""
+import bisect
+import hashlib
+import math
+import random
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+import pytz
+
+KST = pytz.timezone('Asia/Seoul')
+VOTE_WEIGHT = 2.0  # 👍 하나당 더해지는 가중치
+UNRATED_QUALITY = 0.7  # 평점이 없는(0.0) 가게의 품질 점수
+MAX_REJECTIONS = 32
+
+def restaurant_weight(r):
+    rating = r.get('rating') or 0
+    quality = rating / 5 if rating > 0 else UNRATED_QUALITY
+    reviews = (r.get('visited_review') or 0) + (r.get('blog_review') or 0)
+    return (0.5 + quality) * (1 + math.log1p(reviews)) + VOTE_WEIGHT * max(0, r.get('recommand') or 0)
+
+class FenwickTree:
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0.0] * (size + 1)
+        self.values = [0.0] * size
+
+    def set(self, i, value):
+        delta = value - self.values[i]
+        self.values[i] = value
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def total(self):
+        i, result = self.size, 0.0
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def find(self, target):
+        """누적합이 target을 넘는 첫 위치"""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return min(pos, self.size - 1)
+
+class Recommender:
+    def __init__(self, restaurants=(), suppress_window=timedelta(days=3)):
+        self.suppress_window = suppress_window
+        self._rngs = {}
+        self._recent_by_user = defaultdict(deque)  # user_id -> deque[(시각, 가게)]
+        self._recent_by_channel = defaultdict(deque)
+        self.rebuild(restaurants)
+
+    # 가중치
+    def rebuild(self, restaurants):
+        self.restaurants = list(restaurants)
+        self._ids = {r['store_name']: rid for rid, r in enumerate(self.restaurants)}
+        self.tree = FenwickTree(len(self.restaurants))
+        for rid, r in enumerate(self.restaurants):
+            self.tree.set(rid, restaurant_weight(r))
+
+    def update(self, restaurant):
+        """가게 하나의 가중치 갱신 (RestaurantStore 리스너)"""
+        rid = self._ids.get(restaurant['store_name'])
+        if rid is not None:
+            self.tree.set(rid, restaurant_weight(restaurant))
+
+    # 난수
+    def rng(self, guild_id=None):
+        today = datetime.now(KST).strftime('%Y-%m-%d')
+        key = (today, guild_id)
+        rng = self._rngs.get(key)
+        if rng is None:
+            # 날짜가 바뀌면 이전 날짜 흐름은 버림
+            self._rngs = {k: v for k, v in self._rngs.items() if k[0] == today}
+            seed = int(hashlib.sha256(f"{today}:{guild_id}".encode()).hexdigest()[:16], 16)
+            rng = self._rngs[key] = random.Random(seed)
+        return rng
+
+    # 최근 추천 기록
+    def record(self, store_name, user_id=None, channel_id=None, when=None):
+        when = when or datetime.now()
+        if user_id is not None:
+            self._recent_by_user[user_id].append((when, store_name))
+        if channel_id is not None:
+            self._recent_by_channel[channel_id].append((when, store_name))
+
+    def load_history(self, events):
+        """[(store_name, user_id, channel_id, timestamp ISO 문자열), ...] 오래된 것부터"""
+        for store_name, user_id, channel_id, timestamp in events:
+            self.record(store_name, user_id, channel_id, datetime.fromisoformat(timestamp))
+
+    def _recent(self, history, key):
+        if key is None or key not in history:
+            return set()
+        recent = history[key]
+        cutoff = datetime.now() - self.suppress_window
+        while recent and recent[0][0] < cutoff:
+            recent.popleft()
+        return {store_name for _, store_name in recent}
+
+    def suppressed_ids(self, user_id=None, channel_id=None):
+        names = self._recent(self._recent_by_user, user_id) | self._recent(self._recent_by_channel, channel_id)
+        return {self._ids[name] for name in names if name in self._ids}
+
+    # 뽑기
+    def pick(self, candidates=None, user_id=None, channel_id=None, guild_id=None, predicate=None):
+        """candidates(음식점 dict 목록, None이면 전체) 중 predicate(음식점 dict)가 참인 가게를 가중치대로 하나, 없으면 None
+        predicate는 뽑힌 가게에만 확인하므로 전체 후보 목록을 만들지 않아도 된다 (영업 중 여부 등)."""
+        if not self.restaurants:
+            return None
+        rng = self.rng(guild_id)
+        suppressed = self.suppressed_ids(user_id, channel_id)
+        if candidates is None:
+            allowed = None
+        else:
+            allowed = {self._ids[r['store_name']] for r in candidates if r['store_name'] in self._ids}
+            if not allowed:
+                return None
+
+        rid = self._pick_ids(rng, allowed, suppressed, predicate)
+        if rid is None:
+            # 다 최근에 추천된 가게면 중복 제한 없이
+            rid = self._pick_ids(rng, allowed, set(), predicate)
+        return self.restaurants[rid] if rid is not None else None
+
+    def _pick_ids(self, rng, allowed, suppressed, predicate=None):
+        n = len(self.restaurants)
+        ok = (lambda rid: True) if predicate is None else (lambda rid: predicate(self.restaurants[rid]))
+        if allowed is None or len(allowed) * 4 >= n:
+            # 후보가 많으면 전체 트리에서 O(log n)으로 뽑고 후보 밖이면 다시
+            total = self.tree.total()
+            if total <= 0:
+                return None
+            for _ in range(MAX_REJECTIONS):
+                rid = self.tree.find(rng.random() * total)
+                if (allowed is None or rid in allowed) and rid not in suppressed and ok(rid):
+                    return rid
+        # 후보가 적거나 계속 걸러지면 후보 가중치만으로 뽑기
+        pool = [rid for rid in (range(n) if allowed is None else sorted(allowed)) if rid not in suppressed and ok(rid)]
+        weights = [self.tree.values[rid] for rid in pool]
+        if not pool or sum(weights) <= 0:
+            return None
+        cumulative, acc = [], 0.0
+        for w in weights:
+            acc += w
+            cumulative.append(acc)
+        return pool[min(bisect.bisect_right(cumulative, rng.random() * acc), len(pool) - 1)]
@@ -0,0 +1,128 @@
+"""음식점 검색 인덱스
+
+카테고리("일식,돈가스" -> 일식, 돈가스), 가게 이름 단어, 추정 메뉴 키워드(menu_keywords)를
+토큰으로 나눠 토큰 -> 음식점 ID(목록 위치) 집합으로 만들어 둔다.
+- 카테고리/가게 이름은 부분 일치("돈" -> 돈가스), 글자/바이그램 -> 토큰 인덱스로 후보 토큰만 확인
+- 추정 메뉴 키워드는 카테고리/가게 이름에 걸리는 가게가 없을 때만, 그것도 키워드가 검색어로 시작할 때만
+  ("고기"가 소고기국밥 키워드로 국밥집에, "우동"이 분식 키워드로 김밥집에 걸리지 않게)
+데이터가 바뀌면 rebuild로 다시 만든다.
+"""
+import bisect
+from collections import defaultdict
+from menu_keywords import infer_menu_keywords
+
+def normalize(text):
+    return ''.join((text or '').lower().split())
+
+def bigrams(token):
+    return {token[i:i + 2] for i in range(len(token) - 1)}
+
+class RestaurantIndex:
+    def __init__(self, restaurants=()):
+        self.rebuild(restaurants)
+
+    def rebuild(self, restaurants):
+        self.restaurants = list(restaurants)
+        self._token_ids = defaultdict(set)  # 카테고리/가게 이름 토큰 -> 음식점 ID
+        self._keyword_ids = defaultdict(set)  # 추정 메뉴 키워드 -> 음식점 ID
+        self._category_ids = defaultdict(set)  # 카테고리 원문 -> 음식점 ID
+        self._char_tokens = defaultdict(set)  # 글자 -> 토큰
+        self._bigram_tokens = defaultdict(set)  # 바이그램 -> 토큰
+        self._term_cache = {}
+        for rid, r in enumerate(self.restaurants):
+            self._category_ids[r.get('category', '')].add(rid)
+            for token in self._tokens(r):
+                self._token_ids[token].add(rid)
+            for keyword in infer_menu_keywords(r):
+                keyword = normalize(keyword)
+                if keyword:
+                    self._keyword_ids[keyword].add(rid)
+        self._keywords = sorted(self._keyword_ids)
+        for token in self._token_ids:
+            for ch in token:
+                self._char_tokens[ch].add(token)
+            for bigram in bigrams(token):
+                self._bigram_tokens[bigram].add(token)
+
+    def _tokens(self, restaurant):
+        tokens = set()
+        for category in (restaurant.get('category') or '').split(','):
+            tokens.add(normalize(category))
+        for word in (restaurant.get('store_name') or '').split():
+            tokens.add(normalize(word))
+        tokens.add(normalize(restaurant.get('store_name')))
+        tokens.discard('')
+        return tokens
+
+    def _matching_tokens(self, term):
+        """term이 들어 있는 토큰들 (부분 일치)"""
+        if len(term) == 1:
+            return self._char_tokens.get(term, set())
+        candidates = None
+        for bigram in bigrams(term):
+            tokens = self._bigram_tokens.get(bigram)
+            if not tokens:
+                return set()
+            candidates = tokens if candidates is None else candidates & tokens
+        return {token for token in candidates if term in token}
+
+    def _matching_keywords(self, term):
+        """term으로 시작하는 추정 메뉴 키워드들 (정확히 같거나 접두어)"""
+        start = bisect.bisect_left(self._keywords, term)
+        end = start
+        while end < len(self._keywords) and self._keywords[end].startswith(term):
+            end += 1
+        return self._keywords[start:end]
+
+    def match_term(self, term):
+        """검색어 하나에 걸리는 음식점 ID 집합"""
+        term = normalize(term)
+        if not term:
+            return set()
+        ids = self._term_cache.get(term)
+        if ids is None:
+            ids = set()
+            for token in self._matching_tokens(term):
+                ids |= self._token_ids[token]
+            if not ids:
+                for keyword in self._matching_keywords(term):
+                    ids |= self._keyword_ids[keyword]
+            self._term_cache[term] = ids
+        return ids
+
+    def search_ids(self, terms, mode='or'):
+        """검색어 목록으로 음식점 ID 집합 (mode='or'는 하나라도, 'and'는 모두 걸리는 가게)"""
+        result = None
+        for term in terms:
+            ids = self.match_term(term)
+            if result is None:
+                result = set(ids)
+            elif mode == 'and':
+                result &= ids
+            else:
+                result |= ids
+        return result or set()
+
+    def search(self, terms, mode='or'):
+        """검색 결과 음식점 목록 (등록 순서)"""
+        return [self.restaurants[rid] for rid in sorted(self.search_ids(terms, mode))]
+
+    def by_category(self, category):
+        """카테고리 원문이 정확히 같은 음식점 목록"""
+        return [self.restaurants[rid] for rid in sorted(self._category_ids.get(category, ()))]
+
+
+if __name__ == '__main__':
+    import json
+    with open('restaurants.json', 'r', encoding='utf-8') as f:
+        index = RestaurantIndex(json.load(f))
+    # (검색어, 걸리면 안 되는 카테고리)
+    cases = [('고기', '국밥'), ('고기', '죽'), ('우동', '분식'), ('우동', '돈가스'), ('우동', '카레')]
+    failed = 0
+    for term, category in cases:
+        wrong = [r['store_name'] for r in index.search([term]) if category in r['category']]
+        if wrong:
+            failed += 1
+            print(f"❌ {term!r}가 {category} 가게에 걸림: {wrong}")
+    print(f"{len(cases) - failed}/{len(cases)} 통과")
+    raise SystemExit(1 if failed else 0)
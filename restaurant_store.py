@@ -0,0 +1,103 @@
+"""음식점 데이터 저장소
+
+음식점 목록을 메모리에 올려두고 store_name으로 바로 찾는다.
+추천 수 변경은 메모리에서만 하고, 저장은 모아서 잠시 뒤 한 번에 한다 (write_behind).
+저장 위치는 백엔드가 정한다: JsonFileBackend(restaurants.json 전체를 임시 파일에 쓰고 교체)
+또는 lunch_db.LunchDB(바뀐 가게만 UPDATE).
+"""
+import copy
+import json
+from pathlib import Path
+from atomic_io import write_json_atomic
+from write_behind import WriteBehind
+
+FLUSH_DELAY = 2.0  # 마지막 변경 후 이 시간(초) 동안 조용하면 저장
+MAX_FLUSH_DELAY = 10.0  # 변경이 계속 들어와도 이 시간(초) 안에는 저장
+
+class JsonFileBackend:
+    incremental = False  # 저장할 때마다 전체 목록이 필요
+
+    def __init__(self, path='restaurants.json'):
+        self.path = Path(path)
+
+    def load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self, restaurants):
+        write_json_atomic(self.path, restaurants)
+
+class RestaurantStore:
+    def __init__(self, path='restaurants.json', backend=None, flush_delay=FLUSH_DELAY, max_flush_delay=MAX_FLUSH_DELAY):
+        self.backend = backend or JsonFileBackend(path)
+        self.restaurants = []
+        self._by_name = {}
+        self._dirty_names = set()
+        self._writer = WriteBehind(self._snapshot, lambda data: self.backend.save(data[1]), '음식점 데이터',
+                                   flush_delay, max_flush_delay, restore=lambda data: self._mark_dirty(data[0]))
+        self._listeners = []
+        self._reload_listeners = []
+        self.load()
+
+    def load(self):
+        self.restaurants = self.backend.load()
+        self._by_name = {r['store_name']: r for r in self.restaurants}
+        for listener in getattr(self, '_reload_listeners', []):
+            listener(self.restaurants)
+
+    def add_reload_listener(self, listener):
+        """음식점 목록 전체가 다시 로드될 때 목록을 받는 콜백 등록 (검색 인덱스 등)"""
+        self._reload_listeners.append(listener)
+
+    def add_listener(self, listener):
+        """추천 수가 바뀐 가게(dict)를 받는 콜백 등록 (리더보드 등)"""
+        self._listeners.append(listener)
+
+    def _notify(self, restaurant):
+        for listener in self._listeners:
+            listener(restaurant)
+
+    def all(self):
+        return self.restaurants
+
+    def get(self, store_name):
+        return self._by_name.get(store_name)
+
+    def set_recommand(self, store_name, count):
+        """추천 수 변경, 없는 가게면 False"""
+        restaurant = self._by_name.get(store_name)
+        if restaurant is None:
+            return False
+        if restaurant.get('recommand', 0) != count:
+            restaurant['recommand'] = count
+            self._mark_dirty([store_name])
+            self._notify(restaurant)
+        return True
+
+    def add_recommand(self, store_name, delta):
+        restaurant = self._by_name.get(store_name)
+        if restaurant is None:
+            return False
+        return self.set_recommand(store_name, max(0, restaurant.get('recommand', 0) + delta))
+
+    def clear_recommand(self):
+        for r in self.restaurants:
+            r['recommand'] = 0
+            self._notify(r)
+        self._mark_dirty(self._by_name)
+
+    def _mark_dirty(self, store_names):
+        self._dirty_names.update(store_names)
+        self._writer.schedule()
+
+    def _snapshot(self):
+        dirty_names, self._dirty_names = self._dirty_names, set()
+        if self.backend.incremental:
+            return dirty_names, copy.deepcopy([self._by_name[name] for name in dirty_names if name in self._by_name])
+        return dirty_names, copy.deepcopy(self.restaurants)
+
+    async def flush(self):
+        await self._writer.flush()
+
+    def flush_sync(self):
+        self._writer.flush_sync()
@@ -23,32 +23,7 @@ async def main():
 
 import json
 
-# 카테고리 또는 가게명에 따른 메뉴 키워드 매핑
-keyword_map = {
-    "분식": ["김밥", "라면", "떡볶이", "순대", "우동"],
-    "중식당": ["짜장면", "짬뽕", "탕수육", "볶음밥", "마파두부"],
-    "국밥": ["돼지국밥", "소고기국밥", "순댓국", "감자탕"],
-    "찌개": ["된장찌개", "김치찌개", "순두부찌개", "부대찌개"],
-    "전골": ["곱창전골", "버섯전골"],
-    "죽": ["전복죽", "소고기야채죽", "호박죽", "닭죽"],
-    "고기": ["삼겹살", "목살", "항정살", "돼지불백"],
-    "일식": ["돈가스", "카레", "우동", "소바", "연어덮밥"],
-    "샐러드": ["닭가슴살 샐러드", "연어 샐러드", "발사믹 샐러드"],
-    "곱창": ["소곱창", "막창", "대창", "곱창전골"],
-    "요리주점": ["양꼬치", "꿔바로우", "마라샹궈"],
-}
-
-def infer_menu_keywords(store):
-    category = store.get("category", "").lower()
-    name = store.get("store_name", "").lower()
-
-    keywords = set()
-
-    for key, menu_items in keyword_map.items():
-        if key in category or key in name:
-            keywords.update(menu_items)
-
-    return list(keywords)
+from menu_keywords import infer_menu_keywords
 
 # 파일 읽기
 with open("restaurants.json", "r", encoding="utf-8") as f:
@@ -0,0 +1,75 @@
+"""모아서 저장 (write-behind)
+
+이벤트 루프에서는 메모리만 바꾸고 schedule()로 알리면, 잠시 뒤 executor에서 한 번에 저장한다.
+- 마지막 변경 후 delay초 동안 조용하면 저장, 변경이 계속 들어와도 처음 변경 후 max_delay초 안에는 저장
+- 저장은 한 번에 하나씩 (저장 중에 들어온 변경은 그다음 저장에서)
+- 이벤트 루프 밖(스크립트, 종료 시점)에서는 바로 저장
+음식점 추천 수(RestaurantStore), 추천 이벤트 로그(EventLogWriter), AI 설명 캐시(DescriptionCache)가 쓴다.
+"""
+import asyncio
+import logging
+import time
+
+class WriteBehind:
+    def __init__(self, take, write, name, delay, max_delay=None, restore=None):
+        self.take = take  # (루프에서) 저장할 내용을 꺼내고 비움
+        self.write = write  # (executor에서) 꺼낸 내용을 저장
+        self.restore = restore  # 저장에 실패한 내용을 다시 넣음 (없으면 버림)
+        self.name = name
+        self.delay = delay
+        self.max_delay = delay if max_delay is None else max_delay
+        self._since = None  # 저장하지 않은 첫 변경 시각
+        self._handle = None
+        self._lock = None
+
+    @property
+    def pending(self):
+        return self._since is not None
+
+    def schedule(self, immediate=False):
+        """변경이 생겼음을 알림 (immediate면 타이머 없이 바로 저장 시작)"""
+        now = time.monotonic()
+        if self._since is None:
+            self._since = now
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        self._cancel()
+        if immediate:
+            asyncio.ensure_future(self.flush())
+            return
+        delay = min(self.delay, self._since + self.max_delay - now)
+        self._handle = loop.call_later(max(0, delay), lambda: asyncio.ensure_future(self.flush()))
+
+    def _cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _take(self):
+        self._cancel()
+        self._since = None
+        return self.take()
+
+    async def flush(self):
+        """모인 변경이 있으면 executor에서 저장"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._since is None:
+                return
+            data = self._take()
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.write, data)
+            except Exception as e:
+                logging.error(f"{self.name} 저장 실패: {e}")
+                if self.restore is not None:
+                    self.restore(data)
+
+    def flush_sync(self):
+        """종료 시점 등 루프 밖에서 바로 저장"""
+        if self._since is None:
+            return
+        self.write(self._take())